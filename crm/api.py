@@ -1,97 +1,290 @@
+import base64
+import json
+
 import frappe
 from frappe import _
+from frappe.query_builder import Order
+from frappe.query_builder.functions import Count
+
+from crm.conditional import conditional_response
+from crm.news_feed_cache import (
+    get_cached_feed,
+    get_feed_cache_stats,
+    get_feed_version,
+    record_feed_request,
+    reset_feed_cache_stats,
+    set_cached_feed,
+)
+from crm.news_search import NewsSearch
+
+NEWS_PAGE_LENGTH = 50
+MAX_NEWS_PAGE_LENGTH = 200
+
+
+def encode_news_cursor(*position):
+    """Return an opaque cursor for a feed position: (published_date, name), or a search offset"""
+    key = json.dumps(position, default=str)
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_news_cursor(cursor):
+    """Return the position encoded by `encode_news_cursor`"""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        frappe.throw(_("Invalid news cursor"))
+
+
+def _get_news_conditions(News, source=None, period=None, search=None):
+    conditions = [News.published_date.isnotnull()]
+
+    if source:
+        # A story's first article may come from another source, so its
+        # near-duplicates are the only copies a source filter can show
+        conditions.append(News.source == source)
+    else:
+        # Only the first article of each story cluster is listed
+        conditions.append(News.is_near_duplicate == 0)
+
+    if search:
+        conditions.append(search.condition)
+
+    if period:
+        today = frappe.utils.today()
+
+        if period == "today":
+            conditions.append(News.published_date >= today)
+        elif period == "week":
+            conditions.append(News.published_date >= frappe.utils.add_days(today, -7))
+        elif period == "month":
+            conditions.append(News.published_date >= frappe.utils.add_days(today, -30))
+
+    return conditions
+
+
+def _get_news_feed_version():
+    # Deletions do not move max(modified); relative periods move with the day
+    return f"{get_feed_version()}:{frappe.utils.today()}"
 
 
 @frappe.whitelist()
-def get_news_data(source=None, period=None, search_term=None):
+@conditional_response("News", "News Source", version=_get_news_feed_version)
+def get_news_data(
+    source=None,
+    period=None,
+    search_term=None,
+    image_size="medium",
+    page_length=NEWS_PAGE_LENGTH,
+    cursor=None,
+    with_total=0,
+    compact=0,
+):
     """
-    Fetch news articles with sources and image data in a single call
+    Fetch one page of news articles with sources and image data in a single call
+
+    Articles are ordered by (published_date, name) descending and paged with a
+    keyset cursor, so every page is an index range scan however large the
+    archive grows. A search term is matched against the full-text index of
+    titles and content instead, ranked by relevance and paged by offset.
 
     Args:
         source (str, optional): Filter by source name
         period (str, optional): Filter by time period (today, week, month)
-        search_term (str, optional): Search in news titles
+        search_term (str, optional): Search in news titles and content; words match as prefixes
+        image_size (str, optional): Image variant to return (small, medium, original)
+        page_length (int, optional): Number of articles per page (at most 200)
+        cursor (str, optional): `next_cursor` of the previous page
+        with_total (bool, optional): Also count every article matching the filters
+        compact (bool, optional): Return the columnar format of `compact_news_feed`
 
     Returns:
-        dict: News data with articles and sources information
+        dict: News data with articles, sources information and the next page cursor
     """
+    params = {
+        "source": source or None,
+        "period": period or None,
+        "search_term": search_term or None,
+        "image_size": image_size,
+        "page_length": min(max(frappe.utils.cint(page_length) or NEWS_PAGE_LENGTH, 1), MAX_NEWS_PAGE_LENGTH),
+        "cursor": cursor or None,
+        "with_total": frappe.utils.cint(with_total),
+    }
+
     try:
-        # Build filters for news
-        filters = [["published_date", "is", "set"]]
-
-        if source:
-            filters.append(["source", "=", source])
-
-        if search_term:
-            filters.append(["news_title", "like", f"%{search_term}%"])
-
-        if period:
-            import datetime
-
-            today = frappe.utils.today()
-
-            if period == "today":
-                filters.append(["published_date", ">=", today])
-            elif period == "week":
-                week_start = frappe.utils.add_days(today, -7)
-                filters.append(["published_date", ">=", week_start])
-            elif period == "month":
-                month_start = frappe.utils.add_days(today, -30)
-                filters.append(["published_date", ">=", month_start])
-
-        # Get news articles
-        news = frappe.get_all(
-            "News",
-            fields=["name", "news_title", "image", "source", "published_date", "link"],
-            filters=filters,
-            order_by="published_date desc",
-        )
+        with record_feed_request() as stats:
+            response = get_cached_feed(params)
+            stats["hit"] = response is not None
+            if response is None:
+                response = _build_news_feed(**params)
+                set_cached_feed(params, response)
 
-        # Process articles to prepare for frontend
-        for article in news:
-            article["published_date_str"] = frappe.utils.pretty_date(
-                article["published_date"]
-            )
-
-        # Get all unique sources
-        source_names = list(set(article["source"] for article in news))
-
-        # Fetch sources data
-        sources = {}
-        if source_names:
-            source_docs = frappe.get_all(
-                "News Source",
-                fields=["name", "source_name", "favicon"],
-                filters=[["name", "in", source_names]],
-            )
-
-            # Create a dictionary for easier access
-            for source in source_docs:
-                sources[source.name] = {
-                    "name": source.name,
-                    "source_name": source.source_name,
-                    "favicon": source.favicon,
-                }
-
-        # Get all sources for filter dropdown
-        all_sources = frappe.get_all(
-            "News Source", fields=["name", "source_name"], order_by="source_name asc"
-        )
+            # Relative dates change with time, so they are never cached
+            for article in response["news"]:
+                article["published_date_str"] = frappe.utils.pretty_date(article["published_date"])
 
-        return {
-            "success": True,
-            "news": news,
-            "sources": sources,
-            "all_sources": all_sources,
-        }
+        return compact_news_feed(response) if frappe.utils.cint(compact) else response
 
     except Exception as e:
         frappe.log_error(f"Error in get_news_data: {str(e)}", "News API Error")
         return {"success": False, "error": str(e)}
 
 
+COMPACT_ARTICLE_COLUMNS = [
+    "name",
+    "news_title",
+    "published_date",
+    "published_date_str",
+    "link",
+    "image",
+    "image_width",
+    "image_height",
+]
+
+
+def compact_news_feed(response):
+    """
+    Return a feed response as columns instead of a list of dicts.
+
+    Every article field becomes one array in `columns`, so keys are sent once
+    and similar values (links, dates, image paths) sit next to each other,
+    which gzip compresses well. Sources are interned in `source_table`
+    (ordered like `all_sources`, with favicons for the sources on the page)
+    and articles reference them by index in `columns.source`. Decoded by
+    `decodeCompactNewsFeed` in the crm-news page.
+    """
+    table = {"name": [], "source_name": [], "favicon": []}
+    index = {}
+    for source in response["all_sources"]:
+        index[source.name] = len(table["name"])
+        table["name"].append(source.name)
+        table["source_name"].append(source.source_name)
+        table["favicon"].append(response["sources"].get(source.name, {}).get("favicon"))
+
+    news = response["news"]
+    columns = {column: [article.get(column) for article in news] for column in COMPACT_ARTICLE_COLUMNS}
+    columns["source"] = [index.get(article["source"], article["source"]) for article in news]
+
+    return {
+        "success": True,
+        "format": "columns",
+        "columns": columns,
+        "source_table": table,
+        "next_cursor": response["next_cursor"],
+        "total": response["total"],
+    }
+
+
+def _build_news_feed(source, period, search_term, image_size, page_length, cursor, with_total):
+    """Query one page of the news feed; everything in the result is safe to cache"""
+    News = frappe.qb.DocType("News")
+    search = NewsSearch(News, search_term) if search_term else None
+    conditions = _get_news_conditions(News, source, period, search)
+
+    query = (
+        frappe.qb.from_(News)
+        .select(
+            News.name,
+            News.news_title,
+            News.image,
+            News.image_variants,
+            News.source,
+            News.published_date,
+            News.link,
+        )
+        # One extra row tells whether there is a next page
+        .limit(page_length + 1)
+    )
+    for condition in conditions:
+        query = query.where(condition)
+
+    if search and search.score:
+        # Relevance is not a stable key, but search results are small enough to page by offset
+        offset = decode_news_cursor(cursor)[0] if cursor else 0
+        query = query.orderby(search.score, order=Order.desc).offset(offset)
+    elif cursor:
+        last_date, last_name = decode_news_cursor(cursor)
+        last_date = frappe.utils.get_datetime(last_date)
+        query = query.where(
+            (News.published_date < last_date)
+            | ((News.published_date == last_date) & (News.name < last_name))
+        )
+
+    query = query.orderby(News.published_date, order=Order.desc).orderby(News.name, order=Order.desc)
+
+    news = query.run(as_dict=True)
+    next_cursor = None
+    if len(news) > page_length:
+        news = news[:page_length]
+        if search and search.score:
+            next_cursor = encode_news_cursor(offset + page_length)
+        else:
+            next_cursor = encode_news_cursor(news[-1]["published_date"], news[-1]["name"])
+
+    total = None
+    if with_total:
+        count_query = frappe.qb.from_(News).select(Count("*"))
+        for condition in conditions:
+            count_query = count_query.where(condition)
+        total = count_query.run()[0][0]
+
+    # Process articles to prepare for frontend
+    for article in news:
+        # Swap in the resized variant when it has been generated
+        variants = article.pop("image_variants")
+        variant = (json.loads(variants) if isinstance(variants, str) else variants or {}).get(image_size)
+        if variant:
+            article["image"] = variant["url"]
+            article["image_width"] = variant["width"]
+            article["image_height"] = variant["height"]
+
+    # Get all unique sources
+    source_names = list(set(article["source"] for article in news))
+
+    # Fetch sources data
+    sources = {}
+    if source_names:
+        source_docs = frappe.get_all(
+            "News Source",
+            fields=["name", "source_name", "favicon"],
+            filters=[["name", "in", source_names]],
+        )
+
+        # Create a dictionary for easier access
+        for source in source_docs:
+            sources[source.name] = {
+                "name": source.name,
+                "source_name": source.source_name,
+                "favicon": source.favicon,
+            }
+
+    # Get all sources for filter dropdown
+    all_sources = frappe.get_all(
+        "News Source", fields=["name", "source_name"], order_by="source_name asc"
+    )
+
+    return {
+        "success": True,
+        "news": news,
+        "next_cursor": next_cursor,
+        "total": total,
+        "sources": sources,
+        "all_sources": all_sources,
+    }
+
+
+@frappe.whitelist()
+def get_news_feed_cache_stats(reset=0):
+    """Return the hit ratio and latency of the news feed cache"""
+    frappe.only_for("System Manager")
+
+    stats = get_feed_cache_stats()
+    if frappe.utils.cint(reset):
+        reset_feed_cache_stats()
+    return stats
+
 
 @frappe.whitelist()
+@conditional_response("Project", "Contact")
 def get_developer_contact_for_project(project_name):
     """
     Get developer contact details for a project, bypassing Contact permissions
@@ -0,0 +1,219 @@
+"""
+Local HTTP stand-in for Google News and the publisher sites it links to.
+
+Serves the recorded fixtures in `fixtures/` with every link rewritten to point
+back at this server:
+
+    /rss/search                 recorded RSS feed
+    /search                     recorded search page
+    /read/<token>               302 to the article (also /articles/, /rss/articles/)
+    /article/<n>                generated article page
+    /api/attachments/<path>     thumbnail image
+    /favicon/<n>                favicon image
+
+Latency, 429 responses and 5xx failures can be injected per request.
+"""
+
+import base64
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from crm.benchmarks.parser_benchmark import load_fixture
+
+TOKEN_PATTERN = re.compile(r"(?<=/read/)[A-Za-z0-9_-]+|(?<=/articles/)[A-Za-z0-9_-]+|(?<=<guid isPermaLink=\"false\">)[A-Za-z0-9_-]+")
+FAVICON_PATTERN = re.compile(r"https://encrypted-tbn\d\.gstatic\.com/faviconV2\?[^\"]+")
+PARAGRAPH = (
+    "Dubai's residential market extended its run of gains as buyers from Europe, India and the wider "
+    "Gulf competed for ready homes and off-plan units across established communities, while developers "
+    "brought forward launches to meet demand and banks widened mortgage offers for first-time buyers."
+)
+
+
+def _png(width, height, seed):
+    """Return a small valid PNG whose pixels depend on `seed`"""
+    shade = bytes([(seed * 37) % 256, (seed * 91) % 256, (seed * 53) % 256])
+    raw = b"".join(b"\x00" + shade * width for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+class GoogleNewsStub:
+    """
+    Threaded local server answering like Google News and the publishers behind it.
+
+    Args:
+        latency (float): seconds added to every response
+        rate_limit_ratio (float): share of requests answered with 429
+        failure_ratio (float): share of requests answered with 503
+        decodable_tokens (bool): embed the article URL in the token so it can be
+            decoded locally, instead of opaque tokens that need the redirect
+        scale (int): repeat the fixture articles to simulate larger pages
+        distinct_images (int): number of distinct thumbnails, lower values
+            simulate the same image served for syndicated stories
+    """
+
+    def __init__(
+        self,
+        latency=0,
+        rate_limit_ratio=0,
+        failure_ratio=0,
+        decodable_tokens=False,
+        scale=1,
+        distinct_images=None,
+        seed=42,
+    ):
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.failure_ratio = failure_ratio
+        self.decodable_tokens = decodable_tokens
+        self.scale = scale
+        self.distinct_images = distinct_images
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.bytes_sent = 0
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = None
+
+        self.tokens = {}
+        self.numbers = {}
+        self.search_page = self._rewrite(load_fixture("google_news_search.html", scale))
+        self.rss_feed = self._rewrite(load_fixture("google_news_rss.xml", scale))
+
+    def _token(self, original):
+        if original not in self.tokens:
+            number = len(self.tokens)
+            if self.decodable_tokens:
+                url = f"{self.base_url}/article/{number}".encode()
+                token = base64.urlsafe_b64encode(b"\x08\x13\x22" + url).decode().rstrip("=")
+            else:
+                token = f"CBMi{number:06d}stub"
+            self.tokens[original] = token
+            self.numbers[token] = number
+        return self.tokens[original]
+
+    def _rewrite(self, content):
+        content = TOKEN_PATTERN.sub(lambda m: self._token(m.group(0)), content)
+        content = FAVICON_PATTERN.sub(
+            lambda m: f"{self.base_url}/favicon/{zlib.crc32(m.group(0).encode()) % 1000}", content
+        )
+        return content.replace("https://news.google.com", self.base_url)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+                with stub.lock:
+                    stub.requests[(self.kind, status)] += 1
+                    stub.bytes_sent += len(body)
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                self.kind = path.strip("/").split("/")[0] or "root"
+                if path.startswith("/rss/articles/"):
+                    self.kind = "read"
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                with stub.lock:
+                    roll = stub.random.random()
+                if roll < stub.rate_limit_ratio:
+                    return self._send(429, b"Too Many Requests", headers={"Retry-After": "1"})
+                if roll < stub.rate_limit_ratio + stub.failure_ratio:
+                    return self._send(503, b"Service Unavailable")
+
+                if path == "/search":
+                    return self._send(200, stub.search_page.encode("utf-8"))
+
+                if path == "/rss/search":
+                    return self._send(
+                        200, stub.rss_feed.encode("utf-8"), "application/xml; charset=utf-8"
+                    )
+
+                redirect = re.match(r"^/(?:rss/)?(?:read|articles)/([A-Za-z0-9_-]+)", path)
+                if redirect:
+                    number = stub.numbers.get(redirect.group(1))
+                    if number is None:
+                        return self._send(404)
+                    return self._send(302, headers={"Location": f"{stub.base_url}/article/{number}"})
+
+                article = re.match(r"^/article/(\d+)$", path)
+                if article:
+                    number = int(article.group(1))
+                    paragraphs = "".join(
+                        f"<p>{PARAGRAPH} Update {number}.{i}.</p>" for i in range(8)
+                    )
+                    body = (
+                        f"<html><head><title>Article {number}</title></head><body>"
+                        f"<article><h1>Property market update {number}</h1>{paragraphs}</article>"
+                        f"</body></html>"
+                    )
+                    return self._send(200, body.encode("utf-8"))
+
+                if path.startswith("/api/attachments/"):
+                    seed = zlib.crc32(path.encode())
+                    if stub.distinct_images:
+                        seed %= stub.distinct_images
+                    return self._send(200, _png(64, 40, seed), "image/png")
+
+                if path.startswith("/favicon/"):
+                    return self._send(200, _png(16, 16, int(path.rsplit("/", 1)[-1])), "image/png")
+
+                return self._send(404)
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests.clear()
+            self.bytes_sent = 0
+
+    @property
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,143 @@
+"""
+Compare the Google News parser backends on recorded fixture pages.
+
+Run from the bench directory with the app's virtualenv:
+
+    python -m crm.benchmarks.parser_benchmark --repeat 20 --scale 5
+
+`--scale` tiles the <article> elements of the search page to simulate larger
+result pages. Memory is the peak RSS (`ru_maxrss`) of a fresh process parsing
+the page once, so it includes what lxml and selectolax allocate outside the
+Python heap.
+"""
+
+import argparse
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+
+from crm.news_parsers import PARSER_BACKENDS, get_parser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+FIXTURE_FILES = {"search": "google_news_search.html", "rss": "google_news_rss.xml"}
+
+
+def load_fixture(file_name, scale=1):
+    with open(os.path.join(FIXTURES_DIR, file_name), encoding="utf-8") as f:
+        content = f.read()
+
+    if scale > 1:
+        if file_name.endswith(".html"):
+            blocks = re.findall(r"<c-wiz>.*?</c-wiz>", content, flags=re.S)
+            content = content.replace("".join(blocks), "".join(blocks) * scale, 1)
+        else:
+            items = re.findall(r"<item>.*?</item>", content, flags=re.S)
+            content = content.replace("".join(items), "".join(items) * scale, 1)
+
+    return content
+
+
+def measure(parse, content, repeat):
+    """Return (pages per second, parsed result)"""
+    result = parse(content)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parse(content)
+    elapsed = time.perf_counter() - started
+
+    return repeat / elapsed, result
+
+
+def _get_parse(backend, page):
+    parser = get_parser(backend)
+    return parser.parse_search_page if page == "search" else parser.parse_rss
+
+
+def measure_rss(backend, page, scale):
+    """Return (peak RSS, RSS growth while parsing) in KB of a fresh process parsing the page once"""
+    output = subprocess.run(
+        [
+            sys.executable, "-m", "crm.benchmarks.parser_benchmark",
+            "--rss-probe", f"{backend}:{page}", "--scale", str(scale),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    # The parsers print progress, so the probe's figures are the last line
+    before, peak = map(int, output.splitlines()[-1].split())
+    return peak, peak - before
+
+
+def rss_probe(backend, page, scale):
+    content = load_fixture(FIXTURE_FILES[page], scale)
+    parse = _get_parse(backend, page)
+    # ru_maxrss is in KB on Linux (bytes on macOS)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    parse(content)
+    print(before, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def run(repeat=10, scale=1, backends=None):
+    pages = {page: load_fixture(file_name, scale) for page, file_name in FIXTURE_FILES.items()}
+    backends = backends or list(PARSER_BACKENDS)
+    reference = {}
+    report = []
+
+    for page, content in pages.items():
+        for backend in backends:
+            pages_per_sec, result = measure(_get_parse(backend, page), content, repeat)
+            peak_rss, parse_rss = measure_rss(backend, page, scale)
+
+            # Every backend must produce exactly what the first one produced
+            reference.setdefault(page, result)
+            report.append(
+                {
+                    "page": page,
+                    "backend": backend,
+                    "size_kb": round(len(content.encode("utf-8")) / 1024, 1),
+                    "items": len(result),
+                    "pages_per_sec": round(pages_per_sec, 2),
+                    "items_per_sec": round(pages_per_sec * len(result), 1),
+                    "peak_rss_kb": peak_rss,
+                    "parse_rss_kb": parse_rss,
+                    "matches_reference": result == reference[page],
+                }
+            )
+
+    return report
+
+
+def print_report(rows, columns):
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(widths[c]) for c in columns))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    arg_parser.add_argument("--scale", type=int, default=1)
+    arg_parser.add_argument("--backend", action="append", choices=list(PARSER_BACKENDS))
+    arg_parser.add_argument("--rss-probe", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.rss_probe:
+        rss_probe(*args.rss_probe.split(":"), args.scale)
+        return
+
+    columns = [
+        "page", "backend", "size_kb", "items", "pages_per_sec", "items_per_sec",
+        "peak_rss_kb", "parse_rss_kb", "matches_reference",
+    ]
+    print_report(run(args.repeat, args.scale, args.backend), columns)
+
+
+if __name__ == "__main__":
+    main()
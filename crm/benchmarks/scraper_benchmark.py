@@ -0,0 +1,218 @@
+"""
+End-to-end scraper benchmark against the local Google News stand-in.
+
+Runs `GoogleNewsScraper.scrape()` (mode "scrape") or the full ingest path of
+`scrape_and_store_news` for one config (mode "store") under each scenario and
+reports articles/sec, requests per article, DB queries per article and peak
+RSS. The peak RSS of every iteration is sampled across this process and its
+children (the article parser pool); `children_max_rss_mb` is the largest
+`ru_maxrss` of any child reaped so far. Needs a site connection, so run it
+through bench on a scratch site:
+
+    bench --site test.localhost execute crm.benchmarks.scraper_benchmark.run \
+        --kwargs '{"mode": "store", "latency": 0.05}'
+
+Store mode deletes the News rows it created after every iteration.
+"""
+
+import resource
+import threading
+import time
+from collections import Counter
+
+import frappe
+import psutil
+
+from crm.benchmarks.google_news_stub import GoogleNewsStub
+from crm.benchmarks.parser_benchmark import print_report
+from crm.news_scraper import GoogleNewsScraper, scrape_and_store_config
+
+DEFAULT_SCENARIOS = [
+    {"name": "serial", "urlWorkers": 1, "contentConcurrency": 1},
+    {"name": "concurrent", "urlWorkers": 8, "contentConcurrency": 10},
+]
+
+REPORT_COLUMNS = [
+    "scenario",
+    "iteration",
+    "articles",
+    "seconds",
+    "articles_per_sec",
+    "requests",
+    "requests_per_article",
+    "status_429",
+    "db_queries",
+    "db_queries_per_article",
+    "peak_rss_mb",
+    "children_max_rss_mb",
+]
+
+
+class QueryCounter:
+    """Count every query sent through frappe.db.sql while active"""
+
+    def __init__(self):
+        self.count = 0
+        self.original = None
+
+    def __enter__(self):
+        self.original = frappe.db.sql
+
+        def counting_sql(*args, **kwargs):
+            self.count += 1
+            return self.original(*args, **kwargs)
+
+        frappe.db.sql = counting_sql
+        return self
+
+    def __exit__(self, *args):
+        frappe.db.sql = self.original
+
+
+class PeakRSS:
+    """Sample the combined RSS of this process and its children while active and keep the peak"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _sample(self):
+        process = psutil.Process()
+        while True:
+            rss = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    # The child exited between listing and sampling
+                    pass
+            self.peak = max(self.peak, rss)
+
+            if self.stopped.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stopped.set()
+        self.thread.join()
+
+
+def _scraper_overrides(stub, scenario, get_article_content, caches, scale):
+    overrides = {
+        "baseURL": stub.base_url,
+        "limit": 99 * scale,
+        "prettyURLs": True,
+        "getArticleContent": get_article_content,
+        "httpCache": caches,
+        "redirectCache": caches,
+        "since": None,
+        "seenLinkHash": None,
+        # Every stub page lives on one host, so lift the per-publisher limits
+        "urlPerHostLimit": 64,
+        "contentRatePerHost": 1000,
+        "contentBurstPerHost": 100,
+    }
+    overrides.update({key: value for key, value in scenario.items() if key != "name"})
+    return overrides
+
+
+def _run_once(mode, stub, overrides):
+    if mode == "scrape":
+        config = {"searchTerm": "real estate dubai"}
+        config.update(overrides)
+        return len(GoogleNewsScraper(config).scrape())
+
+    # Stored articles link to their config, so use a real, disabled one
+    config = frappe.get_doc(
+        {
+            "doctype": "News Search Config",
+            "search_term": f"real estate dubai {stub.base_url}",
+            "limit": overrides["limit"],
+            "category": "Benchmark",
+            "enabled": 0,
+            "fetch_images": 1,
+        }
+    ).insert(ignore_permissions=True)
+    try:
+        return scrape_and_store_config(config.as_dict(), overrides)
+    finally:
+        frappe.db.delete("News", {"search_config": config.name})
+        frappe.delete_doc("News Search Config", config.name, ignore_permissions=True, force=True)
+        frappe.db.commit()
+
+
+def run(
+    mode="scrape",
+    scenarios=None,
+    latency=0.05,
+    rate_limit_ratio=0,
+    failure_ratio=0,
+    decodable_tokens=False,
+    scale=1,
+    repeat=1,
+    get_article_content=True,
+    caches=False,
+):
+    """
+    Benchmark each scenario against a fresh stand-in server.
+
+    A scenario is a dict of scraper config overrides plus a "name", for
+    example {"name": "wide", "urlWorkers": 16}. With `caches` on and
+    `repeat` > 1, later iterations show the effect of the HTTP and redirect
+    caches.
+    """
+    if mode not in ("scrape", "store"):
+        raise ValueError("mode must be 'scrape' or 'store'")
+
+    report = []
+
+    for scenario in scenarios or DEFAULT_SCENARIOS:
+        with GoogleNewsStub(
+            latency=latency,
+            rate_limit_ratio=rate_limit_ratio,
+            failure_ratio=failure_ratio,
+            decodable_tokens=decodable_tokens,
+            scale=scale,
+        ) as stub:
+            overrides = _scraper_overrides(stub, scenario, get_article_content, caches, scale)
+
+            for iteration in range(1, repeat + 1):
+                stub.reset_stats()
+                started = time.perf_counter()
+
+                with PeakRSS() as rss, QueryCounter() as queries:
+                    articles = _run_once(mode, stub, overrides)
+
+                elapsed = time.perf_counter() - started
+                statuses = Counter()
+                for (_, status), count in stub.requests.items():
+                    statuses[status] += count
+
+                report.append(
+                    {
+                        "scenario": scenario.get("name", "default"),
+                        "iteration": iteration,
+                        "articles": articles,
+                        "seconds": round(elapsed, 2),
+                        "articles_per_sec": round(articles / elapsed, 2) if elapsed else 0,
+                        "requests": stub.total_requests,
+                        "requests_per_article": round(stub.total_requests / max(1, articles), 2),
+                        "status_429": statuses[429],
+                        "db_queries": queries.count,
+                        "db_queries_per_article": round(queries.count / max(1, articles), 2),
+                        "peak_rss_mb": round(rss.peak / 1024 / 1024, 1),
+                        # ru_maxrss is reported in kilobytes on Linux
+                        "children_max_rss_mb": round(
+                            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1
+                        ),
+                    }
+                )
+
+    print_report(report, REPORT_COLUMNS)
+    return report
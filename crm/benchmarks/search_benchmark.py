@@ -0,0 +1,122 @@
+"""
+Compare the full-text News search with the old `news_title LIKE '%term%'` filter.
+
+Inserts a synthetic archive of English and Arabic articles, times both search
+paths for a set of terms and deletes the archive again. Needs a site
+connection, so run it through bench on a scratch site:
+
+    bench --site test.localhost execute crm.benchmarks.search_benchmark.run \
+        --kwargs '{"rows": 200000}'
+"""
+
+import random
+import time
+
+import frappe
+from frappe.query_builder import Order
+
+from crm.benchmarks.parser_benchmark import print_report
+from crm.news_search import NewsSearch, build_search_text
+
+BENCHMARK_CATEGORY = "Search Benchmark"
+INSERT_BATCH_SIZE = 5000
+
+WORDS = [
+    "dubai", "property", "prices", "villa", "apartment", "rental", "market", "developer",
+    "launch", "marina", "downtown", "investors", "mortgage", "rates", "off-plan", "tower",
+    "handover", "quarter", "growth", "demand", "supply", "emaar", "damac", "sobha",
+    # Arabic words with the article, hamza and taa marbuta variants the index normalizes
+    "عقارات", "دبي", "أسعار", "الشقق", "الإيجارات", "مشروع", "المطور", "السوق",
+]
+
+DEFAULT_TERMS = [
+    "dubai property",
+    "villa",
+    "mortg",
+    "emaar launch",
+    "عقارات دبي",
+    "المشروع",
+    "no such story",
+]
+
+REPORT_COLUMNS = ["term", "like_ms", "like_rows", "fulltext_ms", "fulltext_rows", "speedup"]
+
+
+def _insert_archive(rows, seed):
+    rng = random.Random(seed)
+    now = frappe.utils.now_datetime()
+    user = frappe.session.user
+    fields = [
+        "name", "creation", "modified", "owner", "modified_by", "title", "news_title", "link",
+        "content_hash", "story_cluster", "published_date", "category", "content", "search_text",
+    ]
+
+    for start in range(0, rows, INSERT_BATCH_SIZE):
+        values = []
+        for index in range(start, min(rows, start + INSERT_BATCH_SIZE)):
+            name = frappe.generate_hash()
+            title = f"{' '.join(rng.choices(WORDS, k=8))} {index}"
+            content = " ".join(rng.choices(WORDS, k=120))
+            values.append(
+                (
+                    name, now, now, user, user, title, title[:70], f"https://example.com/{name}",
+                    name, name, frappe.utils.add_to_date(now, minutes=-index), BENCHMARK_CATEGORY,
+                    content, build_search_text(title, content),
+                )
+            )
+        frappe.db.bulk_insert("News", fields=fields, values=values)
+        frappe.db.commit()
+
+
+def _time(query, repeat):
+    rows = query.run()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        query.run()
+    return (time.perf_counter() - started) * 1000 / repeat, len(rows)
+
+
+def run(rows=100000, terms=None, repeat=5, page_length=50, seed=7):
+    """Time the first feed page of every term through both search paths"""
+    print(f"Inserting {rows} synthetic news articles")
+    _insert_archive(rows, seed)
+
+    News = frappe.qb.DocType("News")
+    base = (
+        frappe.qb.from_(News)
+        .select(News.name, News.news_title, News.published_date)
+        .where(News.is_near_duplicate == 0)
+        .limit(page_length)
+    )
+    report = []
+
+    try:
+        for term in terms or DEFAULT_TERMS:
+            like_query = base.where(News.news_title.like(f"%{term}%")).orderby(
+                News.published_date, order=Order.desc
+            )
+
+            search = NewsSearch(News, term)
+            fulltext_query = base.where(search.condition)
+            if search.score:
+                fulltext_query = fulltext_query.orderby(search.score, order=Order.desc)
+            fulltext_query = fulltext_query.orderby(News.published_date, order=Order.desc)
+
+            like_ms, like_rows = _time(like_query, repeat)
+            fulltext_ms, fulltext_rows = _time(fulltext_query, repeat)
+            report.append(
+                {
+                    "term": term,
+                    "like_ms": round(like_ms, 2),
+                    "like_rows": like_rows,
+                    "fulltext_ms": round(fulltext_ms, 2),
+                    "fulltext_rows": fulltext_rows,
+                    "speedup": round(like_ms / fulltext_ms, 1) if fulltext_ms else 0,
+                }
+            )
+    finally:
+        frappe.db.delete("News", {"category": BENCHMARK_CATEGORY})
+        frappe.db.commit()
+
+    print_report(report, REPORT_COLUMNS)
+    return report
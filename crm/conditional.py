@@ -0,0 +1,77 @@
+import functools
+import hashlib
+import inspect
+import json
+
+import frappe
+
+
+def get_modified_token(doctypes):
+    """Return the latest `modified` of every doctype; each is one lookup on the modified index"""
+    return [
+        frappe.db.sql(f"select max(modified) from `tab{doctype}`")[0][0] for doctype in doctypes
+    ]
+
+
+def conditional_response(*doctypes, version=None):
+    """
+    Answer "not modified" to clients that already hold the current response.
+
+    The version token (ETag) hashes the method, the session user, the call
+    arguments, the latest `modified` of `doctypes` and, when given, the value
+    of `version()` (for changes `modified` cannot see, such as deletions).
+    It is cheap to compute, so a matching client skips the method's queries,
+    serialization and most of the transfer:
+
+    - a request with a matching `If-None-Match` header gets an empty 304;
+    - a call passing the token back as `etag` gets
+      `{"not_modified": True, "etag": ...}`. `frappe.call` drops arguments
+      missing from the method's signature, so over HTTP the token is read
+      from `frappe.form_dict`.
+
+    Otherwise the method runs and the token is returned as the ETag header
+    and as `etag` in dict results. Use it below `@frappe.whitelist()`.
+    """
+
+    def decorator(fn):
+        parameters = inspect.signature(fn).parameters
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            client_etag = kwargs.pop("etag", None) or frappe.form_dict.get("etag")
+            kwargs = {key: value for key, value in kwargs.items() if key in parameters}
+
+            token = json.dumps(
+                [
+                    f"{fn.__module__}.{fn.__qualname__}",
+                    frappe.session.user,
+                    args,
+                    kwargs,
+                    get_modified_token(doctypes),
+                    version() if version else None,
+                ],
+                sort_keys=True,
+                default=str,
+            )
+            etag = hashlib.sha1(token.encode()).hexdigest()
+
+            response_headers = getattr(frappe.local, "response_headers", None)
+            if response_headers is not None:
+                response_headers["ETag"] = f'"{etag}"'
+
+            if client_etag == etag:
+                return {"not_modified": True, "etag": etag}
+
+            if_none_match = frappe.get_request_header("If-None-Match") or ""
+            if etag in if_none_match:
+                frappe.local.response["http_status_code"] = 304
+                return None
+
+            result = fn(*args, **kwargs)
+            if isinstance(result, dict):
+                result = {**result, "etag": etag}
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,12 +1,72 @@
 # Copyright (c) 2025, Yamen Zakhour and contributors
 # For license information, please see license.txt
 
+import hashlib
+import re
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
 import frappe
 from frappe.model.document import Document
 
+from crm.news_search import add_fulltext_index, build_search_text
+
+TRACKING_PARAM_PREFIXES = ("utm_", "fbclid", "gclid", "ocid", "ref", "cmpid")
+
+
+def canonicalize_link(link):
+    """Normalize an article URL so the same story always maps to the same link"""
+    if not link:
+        return ""
+
+    parts = urlsplit(link.strip())
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+        )
+    )
+    netloc = parts.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+
+    return urlunsplit(
+        (parts.scheme.lower() or "https", netloc, parts.path.rstrip("/"), query, "")
+    )
+
+
+def normalize_title(title):
+    """Case-fold a title and strip punctuation and repeated whitespace"""
+    if not title:
+        return ""
+
+    title = unicodedata.normalize("NFKC", title).casefold()
+    title = re.sub(r"[^\w\s]", " ", title)
+    return " ".join(title.split())
+
+
+def get_link_hash(link):
+    """Return the hash of an article's canonical link"""
+    return hashlib.sha256(canonicalize_link(link).encode("utf-8")).hexdigest()
+
+
+def get_content_hash(link, title):
+    """Return the de-duplication key of an article"""
+    key = f"{canonicalize_link(link)}\n{normalize_title(title)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
 
 class News(Document):
+    def validate(self):
+        self.search_text = build_search_text(self.title, self.content)
+
     def before_insert(self):
+        if not self.content_hash:
+            self.content_hash = get_content_hash(self.link, self.title)
+        if not self.story_cluster:
+            self.story_cluster = self.content_hash
+
         # Clean up URL if needed
         if self.title:
             if len(self.title) > 70:
@@ -21,3 +81,9 @@ class News(Document):
             else:
                 # If title is already 70 characters or less, use it as is
                 self.news_title = self.title
+
+
+def on_doctype_update():
+    # Keyset pagination of the news feed (see crm.api.get_news_data)
+    frappe.db.add_index("News", ["is_near_duplicate", "published_date", "name"])
+    add_fulltext_index()
@@ -1,9 +1,17 @@
 # Copyright (c) 2025, Yamen Zakhour and Contributors
 # See license.txt
 
-# import frappe
+from unittest.mock import MagicMock, patch
+
+import frappe
 from frappe.tests import IntegrationTestCase, UnitTestCase
 
+from crm.api import compact_news_feed, decode_news_cursor, encode_news_cursor
+from crm.conditional import conditional_response
+from crm.crm.doctype.news.news import canonicalize_link, get_content_hash
+from crm.news_clusters import StoryClusterIndex, band_keys, minhash_signature, signature_similarity
+from crm.news_feed_cache import get_feed_cache_stats
+from crm.news_search import get_search_tokens, normalize_search_text
 
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
@@ -18,7 +26,185 @@ class UnitTestNews(UnitTestCase):
 	Use this class for testing individual functions and methods.
 	"""
 
-	pass
+	def test_canonicalize_link_strips_tracking(self):
+		self.assertEqual(
+			canonicalize_link("HTTPS://www.Example.com/story/?utm_source=x&id=2#top"),
+			"https://example.com/story?id=2",
+		)
+
+	def test_content_hash_ignores_title_formatting(self):
+		self.assertEqual(
+			get_content_hash("https://example.com/a", "Dubai  Property Prices Rise!"),
+			get_content_hash("https://example.com/a/", "dubai property prices rise"),
+		)
+
+	def test_news_cursor_round_trip(self):
+		self.assertEqual(
+			decode_news_cursor(encode_news_cursor("2025-04-03 10:15:00", "a1b2c3")),
+			["2025-04-03 10:15:00", "a1b2c3"],
+		)
+
+	def test_compact_news_feed_round_trip(self):
+		news = [
+			{
+				"name": "n1",
+				"news_title": "Prices rise",
+				"published_date": "2025-04-05 10:00:00",
+				"published_date_str": "1 hour ago",
+				"link": "https://gulfnews.com/a",
+				"image": "/files/a.webp",
+				"image_width": 640,
+				"image_height": 360,
+				"source": "Gulf News",
+			},
+			{
+				"name": "n2",
+				"news_title": "New launch",
+				"published_date": "2025-04-05 09:00:00",
+				"published_date_str": "2 hours ago",
+				"link": "https://example.com/b",
+				"image": None,
+				"image_width": None,
+				"image_height": None,
+				"source": "Removed Source",
+			},
+		]
+		response = {
+			"news": news,
+			"sources": {"Gulf News": {"name": "Gulf News", "source_name": "Gulf News", "favicon": "/f.png"}},
+			"all_sources": [
+				frappe._dict(name="Arabian Business", source_name="Arabian Business"),
+				frappe._dict(name="Gulf News", source_name="Gulf News"),
+			],
+			"next_cursor": "abc",
+			"total": 2,
+		}
+
+		compact = compact_news_feed(response)
+		table, columns = compact["source_table"], compact["columns"]
+		self.assertEqual(table["name"], ["Arabian Business", "Gulf News"])
+		self.assertEqual(table["favicon"], [None, "/f.png"])
+		# Sources are referenced by index; unknown ones fall back to their name
+		self.assertEqual(columns["source"], [1, "Removed Source"])
+
+		decoded = []
+		for row in range(len(columns["name"])):
+			article = {column: values[row] for column, values in columns.items()}
+			source = article["source"]
+			article["source"] = table["name"][source] if isinstance(source, int) else source
+			decoded.append(article)
+		self.assertEqual(decoded, news)
+		self.assertEqual((compact["next_cursor"], compact["total"]), ("abc", 2))
+
+	def test_feed_cache_stats_read_raw_counters(self):
+		cache = MagicMock()
+		cache.make_key.side_effect = lambda key: f"site|{key}".encode()
+		cache.get.return_value = b"3"
+		cache.execute_command.return_value = {
+			b"hits": b"3",
+			b"hits_seconds": b"0.006",
+			b"misses": b"1",
+			b"misses_seconds": b"0.2",
+		}
+
+		with patch.object(frappe, "cache", cache):
+			stats = get_feed_cache_stats()
+
+		cache.execute_command.assert_called_once_with("HGETALL", b"site|crm:news_feed:stats")
+		self.assertEqual(
+			stats,
+			{"hits": 3, "misses": 1, "hit_ratio": 0.75, "avg_hit_ms": 2.0, "avg_miss_ms": 200.0, "version": 3},
+		)
+
+	def test_search_text_normalizes_arabic(self):
+		# Diacritics, hamza forms, taa marbuta and the definite article are unified
+		self.assertEqual(normalize_search_text("وبالمَدينة أسعار"), normalize_search_text("مدينه اسعار"))
+		self.assertEqual(get_search_tokens("Dubai's Real-Estate in"), ["dubai", "real", "estate"])
+
+	def test_near_duplicate_titles_share_lsh_band(self):
+		original = minhash_signature("Dubai property prices rise 12% in first quarter as demand surges")
+		syndicated = minhash_signature("Dubai property prices rise 12 percent in first quarter as demand surges")
+		unrelated = minhash_signature("Abu Dhabi launches new metro line connecting Yas Island")
+
+		self.assertGreater(signature_similarity(original, syndicated), 0.6)
+		self.assertTrue(set(band_keys(original)) & set(band_keys(syndicated)))
+		self.assertFalse(set(band_keys(original)) & set(band_keys(unrelated)))
+
+	def test_story_index_remove_drops_entry_and_bands(self):
+		index = StoryClusterIndex()
+		signature = minhash_signature("Emaar launches new tower in Dubai Marina")
+		cache = MagicMock()
+		cache.make_key.side_effect = lambda key: key
+		cache.mget.return_value = [index._encode("cluster", signature), None]
+
+		with patch.object(frappe, "cache", cache):
+			index.remove(["first", "missing"])
+
+		pipeline = cache.pipeline.return_value
+		self.assertEqual(
+			sorted(call.args for call in pipeline.srem.call_args_list),
+			sorted((f"crm:news_story:band:{key}", "first") for key in band_keys(signature)),
+		)
+		pipeline.delete.assert_called_once_with("crm:news_story:entry:first", "crm:news_story:entry:missing")
+
+
+class UnitTestConditionalResponse(UnitTestCase):
+	def setUp(self):
+		self.calls = 0
+
+		@conditional_response("News")
+		def get_feed(page=1):
+			self.calls += 1
+			return {"success": True, "page": page}
+
+		self.get_feed = get_feed
+		self.modified = ["2025-04-05 10:00:00"]
+		for patcher in (
+			patch("crm.conditional.get_modified_token", lambda doctypes: self.modified),
+			patch.object(frappe, "get_request_header", lambda name, default=None: self.header),
+			patch.object(frappe.local, "response", frappe._dict(), create=True),
+			patch.object(frappe.local, "form_dict", frappe._dict(), create=True),
+		):
+			patcher.start()
+			self.addCleanup(patcher.stop)
+		self.header = None
+
+	def test_matching_etag_skips_the_method(self):
+		first = self.get_feed(page=2)
+		self.assertEqual(first["page"], 2)
+
+		self.assertEqual(
+			self.get_feed(page=2, etag=first["etag"]),
+			{"not_modified": True, "etag": first["etag"]},
+		)
+		self.assertEqual(self.calls, 1)
+
+	def test_etag_from_form_dict_through_frappe_call(self):
+		etag = frappe.call(self.get_feed, page=2)["etag"]
+
+		# frappe.call drops `etag` as it is not in the signature; the request still carries it
+		frappe.local.form_dict.update({"page": 2, "etag": etag})
+		self.assertEqual(
+			frappe.call(self.get_feed, **frappe.form_dict),
+			{"not_modified": True, "etag": etag},
+		)
+		self.assertEqual(self.calls, 1)
+
+	def test_etag_changes_with_arguments_and_modified(self):
+		etag = self.get_feed(page=1)["etag"]
+		self.assertNotEqual(self.get_feed(page=2)["etag"], etag)
+
+		self.modified = ["2025-04-05 11:00:00"]
+		self.assertEqual(self.get_feed(page=1, etag=etag)["page"], 1)
+		self.assertEqual(self.calls, 3)
+
+	def test_if_none_match_returns_304(self):
+		etag = self.get_feed()["etag"]
+		self.header = f'"{etag}"'
+
+		self.assertIsNone(self.get_feed())
+		self.assertEqual(frappe.local.response["http_status_code"], 304)
+		self.assertEqual(self.calls, 1)
 
 
 class IntegrationTestNews(IntegrationTestCase):
@@ -0,0 +1,8 @@
+// Copyright (c) 2025, Yamen Zakhour and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("News Scrape Run", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,49 @@
+# Copyright (c) 2025, Yamen Zakhour and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe.model.document import Document
+
+
+class NewsScrapeRun(Document):
+	def finish(self, status, metrics):
+		"""Store the final status, counters, stage timings and errors of the run"""
+		self.status = status
+		self.finished_at = frappe.utils.now_datetime()
+		self.duration = (self.finished_at - frappe.utils.get_datetime(self.started_at)).total_seconds()
+
+		summary = metrics.as_dict()
+		self.articles_seen = metrics.counters["articles_seen"]
+		self.articles_deduplicated = metrics.counters["articles_deduplicated"]
+		self.articles_added = metrics.counters["articles_added"]
+		self.requests = metrics.requests
+		self.bytes_downloaded = summary["bytes_downloaded"]
+		self.requests_by_status = json.dumps(summary["requests_by_status"], indent=1, sort_keys=True)
+		self.counters = json.dumps(summary["counters"], indent=1, sort_keys=True)
+		self.http_cache_hit_rate = metrics.hit_rate("http_cache_hits", "http_cache_misses")
+		self.redirect_cache_hit_rate = metrics.hit_rate("redirect_cache_hits", "redirect_cache_misses")
+		self.errors = "\n".join(metrics.errors)
+
+		self.stages = []
+		for stage, timing in summary["stages"].items():
+			self.append("stages", {"stage": stage, **timing})
+
+		self.save(ignore_permissions=True)
+
+
+def start_scrape_run(config, dispatch_id=None):
+	"""Insert and commit a Running log for one config so in-flight jobs are visible"""
+	run = frappe.get_doc(
+		{
+			"doctype": "News Scrape Run",
+			"search_config": config.name,
+			"search_term": config.search_term,
+			"dispatch_id": dispatch_id,
+			"status": "Running",
+			"started_at": frappe.utils.now_datetime(),
+		}
+	).insert(ignore_permissions=True)
+	frappe.db.commit()
+	return run
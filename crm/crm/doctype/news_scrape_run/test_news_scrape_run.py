@@ -0,0 +1,46 @@
+# Copyright (c) 2025, Yamen Zakhour and Contributors
+# See license.txt
+
+# import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from crm.news_metrics import ScrapeMetrics
+
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record dependencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestNewsScrapeRun(UnitTestCase):
+	"""
+	Unit tests for NewsScrapeRun.
+	Use this class for testing individual functions and methods.
+	"""
+
+	def test_metrics_accumulate_stages_and_responses(self):
+		metrics = ScrapeMetrics()
+		for _ in range(2):
+			with metrics.stage("rss_fetch"):
+				pass
+		metrics.record_response(200, 100)
+		metrics.record_response(429)
+		metrics.increment("http_cache_hits", 3)
+		metrics.increment("http_cache_misses")
+
+		summary = metrics.as_dict()
+		self.assertEqual(summary["stages"]["rss_fetch"]["calls"], 2)
+		self.assertEqual(summary["requests_by_status"], {"200": 1, "429": 1})
+		self.assertEqual(summary["bytes_downloaded"], 100)
+		self.assertEqual(metrics.hit_rate("http_cache_hits", "http_cache_misses"), 75)
+
+
+class IntegrationTestNewsScrapeRun(IntegrationTestCase):
+	"""
+	Integration tests for NewsScrapeRun.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	pass
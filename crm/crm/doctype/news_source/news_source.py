@@ -1,11 +1,17 @@
 # Copyright (c) 2025, Yamen Zakhour and contributors
 # For license information, please see license.txt
 
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
 import frappe
-from frappe.model.document import Document
 import requests
-from io import BytesIO
-import base64
+from frappe.model.document import Document
+
+from crm.news_feed_cache import invalidate_news_feed
+
+FAVICON_TIMEOUT = 10
+FAVICON_WORKERS = 8
 
 
 class NewsSource(Document):
@@ -15,43 +21,121 @@ class NewsSource(Document):
             self.website_url = "https://" + self.website_url
 
     def after_insert(self):
-        self.fetch_favicon()
+        # Favicons are fetched in the background so inserts never wait on the network
+        frappe.enqueue(
+            "crm.crm.doctype.news_source.news_source.fetch_favicons",
+            queue="short",
+            enqueue_after_commit=True,
+            source_names=[self.name],
+        )
 
     def fetch_favicon(self):
-        if not self.website_url:
-            return
+        fetch_favicons([self.name])
 
+
+def get_domain(url):
+    if not url:
+        return ""
+    if not url.startswith("http"):
+        url = "https://" + url
+    domain = urlparse(url).netloc.lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def _download_favicon(candidate_urls):
+    """Return the bytes of the first candidate URL that serves an image"""
+    for url in candidate_urls:
         try:
-            # Extract domain
-            from urllib.parse import urlparse
+            response = requests.get(url, timeout=FAVICON_TIMEOUT)
+            if response.status_code == 200 and response.content:
+                return response.content
+        except Exception:
+            continue
+    return None
 
-            domain = urlparse(self.website_url).netloc
 
-            # Try to get favicon
-            favicon_url = f"https://www.google.com/s2/favicons?domain={domain}&sz=64"
+def fetch_favicons(source_names, favicon_urls=None):
+    """
+    Attach favicons to the given News Sources in one batch.
 
-            # Download the favicon
-            response = requests.get(favicon_url)
-            if response.status_code == 200:
-                file_content = response.content
-                file_name = f"{domain.replace('.', '_')}_favicon.png"
+    Sources are grouped by domain so every source on a domain shares one file.
+    A domain that already has a favicon file is reused without any request;
+    otherwise the favicon the scraper saw in Google's results is tried first,
+    then Google's favicon service.
+    """
+    favicon_urls = favicon_urls or {}
+    sources = frappe.get_all(
+        "News Source",
+        filters={"name": ["in", source_names], "favicon": ["is", "not set"]},
+        fields=["name", "website_url"],
+    )
 
-                # Attach file to document
-                from frappe.utils.file_manager import save_file
+    domains = {}
+    for source in sources:
+        domain = get_domain(source.website_url)
+        if domain:
+            domains.setdefault(domain, []).append(source.name)
 
-                file_doc = save_file(
-                    file_name, file_content, "News Source", self.name, is_private=0
-                )
+    if not domains:
+        return
 
-                # Set the favicon field
-                if file_doc:
-                    self.favicon = file_doc.file_url
-                    self.db_update()  # Save the document with the updated favicon field
+    # Reuse favicon files already stored for these domains
+    pending = {}
+    for domain, names in domains.items():
+        file_name = f"{domain.replace('.', '_')}_favicon.png"
+        file_url = frappe.db.get_value(
+            "File", {"file_name": file_name, "is_private": 0}, "file_url"
+        )
+        if file_url:
+            _set_favicon(names, file_url)
+            continue
 
-        except Exception as e:
-            import traceback
+        candidates = [
+            favicon_urls[name]
+            for name in names
+            if (favicon_urls.get(name) or "").startswith("http")
+        ]
+        candidates.append(f"https://www.google.com/s2/favicons?domain={domain}&sz=64")
+        pending[domain] = candidates
 
-            frappe.log_error(
-                f"Error fetching favicon: {str(e)}\n{traceback.format_exc()}",
-                "News Source Favicon Error",
+    if pending:
+        with ThreadPoolExecutor(
+            max_workers=min(FAVICON_WORKERS, len(pending))
+        ) as executor:
+            contents = dict(
+                zip(pending, executor.map(_download_favicon, pending.values()), strict=True)
             )
+
+        for domain, content in contents.items():
+            if not content:
+                continue
+
+            try:
+                file_doc = frappe.get_doc(
+                    {
+                        "doctype": "File",
+                        "file_name": f"{domain.replace('.', '_')}_favicon.png",
+                        "content": content,
+                        "is_private": 0,
+                    }
+                ).insert(ignore_permissions=True)
+                _set_favicon(domains[domain], file_doc.file_url)
+
+            except Exception as e:
+                import traceback
+
+                frappe.log_error(
+                    f"Error fetching favicon: {str(e)}\n{traceback.format_exc()}",
+                    "News Source Favicon Error",
+                )
+
+    frappe.db.commit()
+    # set_value skips doc events, so cached feeds would keep the old favicons
+    invalidate_news_feed()
+
+
+def _set_favicon(source_names, file_url):
+    for source_name in source_names:
+        frappe.db.set_value(
+            "News Source", source_name, "favicon", file_url, update_modified=False
+        )
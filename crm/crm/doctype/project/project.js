@@ -129,17 +129,27 @@ function show_contact_assignment_dialog(frm) {
 
 function show_contact_details_dialog(frm) {
 	if (!frm.doc.developer_contact) return;
+
+	// Reopening the dialog only re-sends the contact when it changed on the server
+	const cached = frm.__developer_contact;
 	frappe.call({
 		method: "crm.api.get_developer_contact_for_project",
 		args: {
 			project_name: frm.doc.name,
+			etag: cached && cached.project_name === frm.doc.name ? cached.etag : undefined,
 		},
 		freeze: true,
 		freeze_message: __("Loading contact details..."),
 		callback: function (r) {
+			let message = r.message;
+			if (message && message.not_modified) {
+				message = cached;
+			} else if (message && message.status === "success") {
+				frm.__developer_contact = { ...message, project_name: frm.doc.name };
+			}
 
-			if (r.message && r.message.status === "success") {
-				const contact = r.message.contact;
+			if (message && message.status === "success") {
+				const contact = message.contact;
 
 				// Use Gravatar if available
 				const contactImage = contact.full_name
@@ -290,7 +300,7 @@ function show_contact_details_dialog(frm) {
 			} else {
 				frappe.msgprint({
 					title: __("Contact Information"),
-					message: r.message?.message || __("Could not load contact information"),
+					message: message?.message || __("Could not load contact information"),
 					indicator: "orange",
 				});
 			}
@@ -34,6 +34,7 @@ function initPage(page, filters_section, content) {
 	// Load all sources for the filter dropdown
 	frappe.call({
 		method: "crm.api.get_news_data",
+		args: { page_length: 1 },
 		callback: function (r) {
 			if (r.message && r.message.success) {
 				// Add source and date filters with the sources data
@@ -122,47 +123,81 @@ function addDateFilter(filters_section, content, state) {
 	});
 }
 
-function loadNews(content, filters) {
-	// Show loading state
-	content.html(`
-        <div class="crm-news-loading">
-            <div class="crm-news-loading-animation"></div>
-            <div class="crm-news-loading-text">Loading news...</div>
-        </div>
-    `);
+function loadNews(content, filters, cursor) {
+	const args = {
+		source: filters.source,
+		period: filters.period,
+		search_term: filters.searchTerm,
+		image_size: getNewsImageSize(),
+		cursor: cursor,
+		with_total: cursor ? 0 : 1,
+		compact: 1,
+	};
+
+	// Each first page starts a new feed; pages of an older feed are dropped
+	const previous = content.data("feed");
+	let feed = previous;
+	if (!cursor) {
+		feed = { key: JSON.stringify(args) };
+		content.data("feed", feed);
+
+		if (previous && previous.key === feed.key && previous.etag) {
+			// Refreshing the same view: keep it on screen, the server answers
+			// "not modified" when nothing changed
+			args.etag = previous.etag;
+		} else {
+			// Show loading state
+			content.html(`
+                <div class="crm-news-loading">
+                    <div class="crm-news-loading-animation"></div>
+                    <div class="crm-news-loading-text">Loading news...</div>
+                </div>
+            `);
+		}
+	}
 
 	// Call the API endpoint with filters
 	frappe.call({
 		method: "crm.api.get_news_data",
-		args: {
-			source: filters.source,
-			period: filters.period,
-			search_term: filters.searchTerm,
-		},
+		args: args,
 		callback: function (r) {
-			if (r.message && r.message.success) {
-				const { news, sources } = r.message;
+			if (content.data("feed") !== feed) {
+				return;
+			}
 
-				// Update the count display
-				updateArticleCount(news.length);
+			if (r.message && r.message.not_modified) {
+				content.data("feed", previous);
+				return;
+			}
 
-				if (news.length === 0) {
-					content.html(`
-                        <div class="crm-news-no-news">
-                            <div class="crm-news-no-news-icon">
-                                <i data-feather="file-text" style="width: 48px; height: 48px;"></i>
+			if (r.message && r.message.success) {
+				const { news, sources, next_cursor, total } = decodeCompactNewsFeed(r.message);
+
+				if (!cursor) {
+					feed.total = total;
+					feed.etag = r.message.etag;
+
+					if (news.length === 0) {
+						updateArticleCount(0);
+						content.html(`
+                            <div class="crm-news-no-news">
+                                <div class="crm-news-no-news-icon">
+                                    <i data-feather="file-text" style="width: 48px; height: 48px;"></i>
+                                </div>
+                                <div class="crm-news-no-news-text">No news found</div>
+                                <div class="crm-news-no-news-subtext">Try adjusting your filters</div>
                             </div>
-                            <div class="crm-news-no-news-text">No news found</div>
-                            <div class="crm-news-no-news-subtext">Try adjusting your filters</div>
-                        </div>
-                    `);
-					if (typeof feather !== "undefined") {
-						feather.replace();
+                        `);
+						if (typeof feather !== "undefined") {
+							feather.replace();
+						}
+						return;
 					}
-					return;
+
+					content.empty().append('<div class="crm-news-grid"></div>');
 				}
 
-				let news_grid = $('<div class="crm-news-grid"></div>');
+				let news_grid = content.find(".crm-news-grid");
 
 				// Render each news item using the preloaded source data
 				news.forEach((item, index) => {
@@ -170,8 +205,24 @@ function loadNews(content, filters) {
 					renderNewsItem(news_grid, item, sourceData.favicon, index);
 				});
 
-				// Replace content
-				content.empty().append(news_grid);
+				// Update the count display
+				updateArticleCount(news_grid.children().length, feed.total);
+
+				content.find(".crm-news-load-more").remove();
+				if (next_cursor) {
+					$(`<div class="crm-news-load-more">
+                        <button class="btn btn-default btn-sm">${__("Load more")}</button>
+                    </div>`)
+						.appendTo(content)
+						.find("button")
+						.on("click", function () {
+							$(this).prop("disabled", true).text(__("Loading..."));
+							loadNews(content, filters, next_cursor);
+						});
+				}
+			} else if (cursor) {
+				content.find(".crm-news-load-more button").prop("disabled", false).text(__("Load more"));
+				frappe.show_alert({ message: __("Unable to load more news"), indicator: "red" });
 			} else {
 				updateArticleCount(0);
 				content.html(`
@@ -191,8 +242,54 @@ function loadNews(content, filters) {
 	});
 }
 
+// Expand the columnar `compact` response of crm.api.get_news_data into the regular shape
+function decodeCompactNewsFeed(message) {
+	if (message.format !== "columns") {
+		return message;
+	}
+
+	const { columns, source_table, ...rest } = message;
+	const sourceAt = (index) =>
+		typeof index === "number"
+			? {
+					name: source_table.name[index],
+					source_name: source_table.source_name[index],
+					favicon: source_table.favicon[index],
+			  }
+			: { name: index, source_name: index, favicon: null };
+
+	const sources = {};
+	const news = columns.name.map((_, row) => {
+		const source = sourceAt(columns.source[row]);
+		sources[source.name] = source;
+
+		const article = { source: source.name };
+		Object.keys(columns).forEach((column) => {
+			if (column !== "source") {
+				article[column] = columns[column][row];
+			}
+		});
+		return article;
+	});
+
+	return {
+		...rest,
+		news: news,
+		sources: sources,
+		all_sources: source_table.name.map((_, index) => {
+			const { name, source_name } = sourceAt(index);
+			return { name, source_name };
+		}),
+	};
+}
+
+// Cards render 250-400px wide; only high-density wide screens need the larger variant
+function getNewsImageSize() {
+	return window.innerWidth > 768 && window.devicePixelRatio > 1 ? "medium" : "small";
+}
+
 // Add a function to update the article count
-function updateArticleCount(count) {
+function updateArticleCount(count, total) {
 	let countDisplay = $(".crm-news-count-display");
 
 	if (countDisplay.length === 0) {
@@ -204,6 +301,8 @@ function updateArticleCount(count) {
 	// Update the count text with appropriate wording
 	if (count === 0) {
 		countDisplay.html(`<span>No articles found</span>`);
+	} else if (total > count) {
+		countDisplay.html(`<span>Showing ${count} of ${total} articles</span>`);
 	} else if (count === 1) {
 		countDisplay.html(`<span>Showing 1 article</span>`);
 	} else {
@@ -221,7 +320,11 @@ function renderNewsItem(container, newsItem, sourceFavicon, index) {
             <div class="crm-news-image">
                 ${
 					newsItem.image
-						? `<img src="${newsItem.image}" alt="${newsItem.news_title}">`
+						? `<img src="${newsItem.image}" alt="${newsItem.news_title}" loading="lazy"${
+								newsItem.image_width
+									? ` width="${newsItem.image_width}" height="${newsItem.image_height}"`
+									: ""
+						  }>`
 						: `<div class="crm-news-placeholder-image">${newsItem.news_title.charAt(
 								0
 						  )}</div>`
@@ -601,6 +704,12 @@ frappe.pages["crm-news"].on_page_show = function () {
                 animation-delay: calc(var(--index, 0) * 0.05s);
             }
 			
+			.crm-news-load-more {
+				display: flex;
+				justify-content: center;
+				padding: var(--padding-md) 0;
+			}
+
 			.crm-news-count-display {
 				padding: var(--padding-sm) var(--padding-md);
 				color: var(--text-muted);
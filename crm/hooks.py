@@ -170,18 +170,34 @@ after_migrate = "crm.install.after_migrate.after_migrate"
 # ---------------
 # Hook on document methods and events
 
-# doc_events = {
-# 	"*": {
-# 		"on_update": "method",
-# 		"on_cancel": "method",
-# 		"on_trash": "method"
-# 	}
-# }
+doc_events = {
+	"News": {
+		"after_insert": "crm.news_feed_cache.invalidate_news_feed",
+		"on_update": "crm.news_feed_cache.invalidate_news_feed",
+		"on_trash": "crm.news_feed_cache.invalidate_news_feed",
+		"after_delete": "crm.news_clusters.on_news_delete",
+	},
+	"News Source": {
+		"after_insert": "crm.news_feed_cache.invalidate_news_feed",
+		"on_update": "crm.news_feed_cache.invalidate_news_feed",
+		"on_trash": "crm.news_feed_cache.invalidate_news_feed",
+	},
+}
 
 
 # Scheduled Tasks
 # ---------------
-scheduler_events = {"daily": ["crm.news_scraper.scrape_and_store_news"]}
+scheduler_events = {
+	"daily": [
+		"crm.news_scraper.scrape_and_store_news",
+		"crm.news_retention.apply_news_retention",
+	],
+	"cron": {
+		"*/10 * * * *": [
+			"crm.news_scraper.top_up_news_scrape_jobs",
+		],
+	},
+}
 # scheduler_events = {
 # 	"all": [
 # 		"crm.tasks.all"
@@ -275,3 +291,4 @@ scheduler_events = {"daily": ["crm.news_scraper.scrape_and_store_news"]}
 # default_log_clearing_doctypes = {
 # 	"Logging DocType Name": 30  # days to retain logs
 # }
+default_log_clearing_doctypes = {"News Scrape Run": 90}
@@ -0,0 +1,196 @@
+import random
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+import frappe
+
+# Markers of Google's "sorry" interstitial; only looked for on Google hosts,
+# since publisher pages routinely embed reCAPTCHA in comment or newsletter forms
+CAPTCHA_MARKERS = re.compile(
+    r"unusual traffic from your computer network|/sorry/index|captcha-form",
+    re.IGNORECASE,
+)
+GOOGLE_HOST = re.compile(r"(^|\.)google\.[a-z.]+$")
+
+
+def is_captcha_page(url="", text=""):
+    """Return True for Google's consent / "sorry" interstitials and captcha challenges"""
+    url = url or ""
+    host = urlparse(url).netloc.split(":")[0]
+    if not GOOGLE_HOST.search(host):
+        return False
+    if host.startswith("consent.") or "/sorry/" in url:
+        return True
+    return bool(text) and bool(CAPTCHA_MARKERS.search(text[:20000]))
+
+
+def parse_retry_after(value):
+    """Return the seconds of a numeric Retry-After header, or None"""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open"""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"Circuit open for {host}, retrying in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class HostCircuitBreaker:
+    """
+    Per-host circuit breaker shared by every scraper process through the site cache.
+
+    A 429 or a captcha page opens the host's circuit for an exponentially
+    growing, jittered delay (honouring Retry-After), and every scraper
+    process stops sending requests to it. When the delay is over, one process
+    claims the half-open probe: its next request decides whether the circuit
+    closes or opens again for longer.
+
+    The site cache is only read in `load` and written in `publish`, which
+    must run on the thread owning the site connection. `allow`,
+    `record_success` and `record_failure` only touch the in-process state and
+    are safe to call from worker threads in between.
+    """
+
+    def __init__(
+        self,
+        base_delay=30,
+        max_delay=3600,
+        probe_timeout=120,
+        namespace="crm:news_circuit",
+    ):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.probe_timeout = probe_timeout
+        self.namespace = namespace
+        self.lock = threading.Lock()
+        self.hosts = {}
+        self.dirty = set()
+        self.rejected = 0
+        self.opened = 0
+
+    def _key(self, *parts):
+        return ":".join((self.namespace,) + parts)
+
+    def _new_state(self):
+        return {"state": "closed", "failures": 0, "open_until": 0}
+
+    def load(self, hosts):
+        """Pull the shared state of `hosts` into this process"""
+        now = time.time()
+        for host in set(hosts) - set(self.hosts):
+            state = self._new_state()
+            shared = frappe.cache.get_value(self._key("host", host))
+
+            if shared and shared["open_until"] > now:
+                state.update(shared, state="open")
+            elif shared:
+                # Only one process probes a recovering host
+                claimed = frappe.cache.set(
+                    frappe.cache.make_key(self._key("probe", host)),
+                    1,
+                    nx=True,
+                    ex=self.probe_timeout,
+                )
+                if claimed:
+                    state.update(shared, state="half_open")
+                else:
+                    state.update(shared, state="open", open_until=now + self.probe_timeout)
+
+            with self.lock:
+                self.hosts[host] = state
+
+    def allow(self, host):
+        """Return whether a request to `host` may be sent now"""
+        with self.lock:
+            state = self.hosts.setdefault(host, self._new_state())
+
+            if state["state"] == "open" and time.time() >= state["open_until"]:
+                state["state"] = "half_open"
+
+            if state["state"] == "half_open":
+                # Let exactly one probe through until its result is recorded
+                state["state"] = "probing"
+                return True
+
+            if state["state"] in ("open", "probing"):
+                self.rejected += 1
+                return False
+
+            return True
+
+    def retry_in(self, host):
+        with self.lock:
+            state = self.hosts.get(host)
+            return max(0, state["open_until"] - time.time()) if state else 0
+
+    def check(self, url):
+        """Raise CircuitOpenError if a request to `url` may not be sent"""
+        host = urlparse(url).netloc
+        if not self.allow(host):
+            raise CircuitOpenError(host, self.retry_in(host))
+
+    def record_success(self, host):
+        with self.lock:
+            state = self.hosts.setdefault(host, self._new_state())
+            if state["state"] != "closed" or state["failures"]:
+                state.update(self._new_state())
+                self.dirty.add(host)
+
+    def record_failure(self, host, retry_after=None):
+        """Open the circuit of `host` after a 429 or captcha and return the delay"""
+        with self.lock:
+            state = self.hosts.setdefault(host, self._new_state())
+            state["failures"] += 1
+
+            delay = min(self.max_delay, self.base_delay * 2 ** (state["failures"] - 1))
+            delay = random.uniform(delay / 2, delay)
+            if retry_after:
+                delay = max(delay, min(self.max_delay, retry_after))
+
+            if state["state"] != "open":
+                self.opened += 1
+            state["state"] = "open"
+            state["open_until"] = max(state["open_until"], time.time() + delay)
+            self.dirty.add(host)
+            return delay
+
+    def record_response(self, url, status_code, text="", retry_after=None, location=""):
+        """Update the circuit of the response's host from its status, body and redirect target"""
+        host = urlparse(url).netloc
+        if status_code == 429 or is_captcha_page(url, text) or is_captcha_page(location):
+            return self.record_failure(host, retry_after)
+        if status_code < 500:
+            self.record_success(host)
+        return 0
+
+    def publish(self):
+        """Share every state change since the last publish with other processes"""
+        with self.lock:
+            changes = {host: dict(self.hosts[host]) for host in self.dirty}
+            self.dirty = set()
+
+        for host, state in changes.items():
+            key = self._key("host", host)
+            if state["state"] == "closed":
+                frappe.cache.delete_value(key)
+                frappe.cache.delete(frappe.cache.make_key(self._key("probe", host)))
+                continue
+
+            shared = frappe.cache.get_value(key) or {}
+            frappe.cache.set_value(
+                key,
+                {
+                    "failures": max(state["failures"], shared.get("failures", 0)),
+                    "open_until": max(state["open_until"], shared.get("open_until", 0)),
+                },
+                # Keep the failure count long enough for the backoff to keep growing
+                expires_in_sec=self.max_delay * 4,
+            )
@@ -0,0 +1,268 @@
+import hashlib
+import random
+import struct
+from collections import defaultdict
+
+import frappe
+
+from crm.crm.doctype.news.news import normalize_title
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 4
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Fixed seed so signatures stay comparable across processes and runs
+_rng = random.Random(20250403)
+PERMUTATIONS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def _stable_hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def title_shingles(title):
+    """Return the character shingles of a normalized title"""
+    text = normalize_title(title)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(title):
+    """Return the MinHash signature of a title as a tuple of NUM_PERMUTATIONS ints"""
+    hashes = [_stable_hash(shingle) for shingle in title_shingles(title)] or [0]
+    return tuple(
+        min((a * value + b) % MERSENNE_PRIME for value in hashes) for a, b in PERMUTATIONS
+    )
+
+
+def band_keys(signature):
+    """Split a signature into LSH bands; titles sharing any band are candidates"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f"{ROWS_PER_BAND}Q", *rows), digest_size=8).hexdigest()
+        keys.append(f"{band}:{digest}")
+    return keys
+
+
+def signature_similarity(a, b):
+    """Estimate the Jaccard similarity of two titles from their signatures"""
+    return sum(x == y for x, y in zip(a, b, strict=True)) / NUM_PERMUTATIONS
+
+
+class StoryClusterIndex:
+    """
+    LSH index of recent News titles, used to group near-duplicate stories.
+
+    Every stored article is indexed under its content hash with the MinHash
+    signature of its title, bucketed into BANDS bands in the site cache, so a
+    new title is only compared with the few stored titles sharing a band
+    instead of every article. The first article of a story is its cluster's
+    representative; later near-duplicates join the cluster and are flagged.
+
+    Entries expire after `ttl` seconds. When the index is missing (e.g. after a
+    cache flush) it is rebuilt from the News stored within the same window.
+    Must be used from the thread that owns the site connection.
+    """
+
+    def __init__(self, threshold=0.6, ttl=14 * 24 * 3600, namespace="crm:news_story"):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.namespace = namespace
+        self.local_buckets = defaultdict(set)
+        self.local_entries = {}
+        self.new_clusters = set()
+        self.stored_clusters = set()
+        self.pending = {}
+
+    def _key(self, *parts):
+        return frappe.cache.make_key(":".join((self.namespace,) + parts))
+
+    def _encode(self, cluster, signature):
+        return cluster.encode() + struct.pack(f"{NUM_PERMUTATIONS}Q", *signature)
+
+    def _decode(self, value):
+        cluster = value[:-8 * NUM_PERMUTATIONS].decode()
+        return cluster, struct.unpack(f"{NUM_PERMUTATIONS}Q", value[-8 * NUM_PERMUTATIONS :])
+
+    def ensure_loaded(self):
+        if not frappe.cache.get(self._key("ready")):
+            self.rebuild()
+
+    def rebuild(self):
+        """Index every News published within the TTL window"""
+        rows = frappe.get_all(
+            "News",
+            filters={
+                "creation": [">=", frappe.utils.add_to_date(None, seconds=-self.ttl)],
+                "content_hash": ["is", "set"],
+            },
+            fields=["content_hash", "title", "story_cluster"],
+        )
+        for row in rows:
+            self._remember(row.content_hash, row.story_cluster or row.content_hash, minhash_signature(row.title))
+            self.pending[row.content_hash] = self.local_entries[row.content_hash]
+
+        self.flush()
+        frappe.cache.set(self._key("ready"), 1, ex=self.ttl)
+        print(f"Rebuilt story cluster index from {len(rows)} news articles")
+
+    def _remember(self, content_hash, cluster, signature):
+        self.local_entries[content_hash] = (cluster, signature)
+        for key in band_keys(signature):
+            self.local_buckets[key].add(content_hash)
+
+    def _stored_candidates(self, keys):
+        """Return stored entries sharing a band with any of `keys`, in two round trips"""
+        pipeline = frappe.cache.pipeline()
+        for key in keys:
+            pipeline.smembers(self._key("band", key))
+        members = set().union(*pipeline.execute())
+
+        content_hashes = [member.decode() for member in members]
+        if not content_hashes:
+            return {}
+
+        values = frappe.cache.mget([self._key("entry", content_hash) for content_hash in content_hashes])
+        return {
+            content_hash: self._decode(value)
+            for content_hash, value in zip(content_hashes, values, strict=True)
+            if value
+        }
+
+    def assign(self, articles):
+        """
+        Set `story_cluster` and `is_near_duplicate` on every article.
+
+        Articles are compared with the stored index and with the articles
+        before them in the batch.
+        """
+        self.ensure_loaded()
+
+        signatures = [minhash_signature(article["title"]) for article in articles]
+        article_keys = [band_keys(signature) for signature in signatures]
+        stored = self._stored_candidates(list({key for keys in article_keys for key in keys}))
+        for content_hash, (cluster, signature) in stored.items():
+            self._remember(content_hash, cluster, signature)
+
+        for article, signature, keys in zip(articles, signatures, article_keys, strict=True):
+            candidates = set().union(*(self.local_buckets[key] for key in keys))
+            candidates.discard(article["content_hash"])
+
+            best_cluster, best_similarity = None, 0
+            for content_hash in candidates:
+                cluster, candidate_signature = self.local_entries[content_hash]
+                similarity = signature_similarity(signature, candidate_signature)
+                if similarity > best_similarity:
+                    best_cluster, best_similarity = cluster, similarity
+
+            if best_similarity >= self.threshold:
+                article["story_cluster"] = best_cluster
+                article["is_near_duplicate"] = 1
+            else:
+                article["story_cluster"] = article["content_hash"]
+                article["is_near_duplicate"] = 0
+                self.new_clusters.add(article["content_hash"])
+
+            self._remember(article["content_hash"], article["story_cluster"], signature)
+
+        return articles
+
+    def prepare(self, article):
+        """Promote an article to representative if its cluster's first article was not stored"""
+        cluster = article["story_cluster"]
+        if cluster in self.new_clusters and cluster not in self.stored_clusters:
+            article["is_near_duplicate"] = 0
+
+    def add(self, article):
+        """Queue a stored article for the persistent index"""
+        self.stored_clusters.add(article["story_cluster"])
+        self.pending[article["content_hash"]] = self.local_entries[article["content_hash"]]
+
+    def flush(self):
+        """Write queued entries and their band memberships to the site cache"""
+        if not self.pending:
+            return
+
+        pipeline = frappe.cache.pipeline()
+        for content_hash, (cluster, signature) in self.pending.items():
+            pipeline.set(self._key("entry", content_hash), self._encode(cluster, signature), ex=self.ttl)
+            for key in band_keys(signature):
+                pipeline.sadd(self._key("band", key), content_hash)
+                pipeline.expire(self._key("band", key), self.ttl)
+        pipeline.execute()
+        self.pending = {}
+
+    def remove(self, content_hashes):
+        """Drop deleted articles from the persistent index"""
+        keys = [self._key("entry", content_hash) for content_hash in content_hashes]
+        if not keys:
+            return
+
+        pipeline = frappe.cache.pipeline()
+        for content_hash, value in zip(content_hashes, frappe.cache.mget(keys), strict=True):
+            if value:
+                for key in band_keys(self._decode(value)[1]):
+                    pipeline.srem(self._key("band", key), content_hash)
+        pipeline.delete(*keys)
+        pipeline.execute()
+
+
+def promote_story_representatives(clusters):
+    """
+    List the earliest remaining article of every cluster whose listed article was deleted.
+
+    Only the first article of a cluster is listed in the feed, so without this
+    the whole story would disappear with it.
+    """
+    clusters = list({cluster for cluster in clusters if cluster})
+    if not clusters:
+        return
+
+    listed = set(
+        frappe.get_all(
+            "News",
+            filters={"story_cluster": ["in", clusters], "is_near_duplicate": 0},
+            pluck="story_cluster",
+        )
+    )
+    orphaned = [cluster for cluster in clusters if cluster not in listed]
+    if not orphaned:
+        return
+
+    representatives = {}
+    for row in frappe.get_all(
+        "News",
+        filters={"story_cluster": ["in", orphaned]},
+        fields=["name", "story_cluster"],
+        order_by="published_date asc, name asc",
+    ):
+        representatives.setdefault(row.story_cluster, row.name)
+
+    if representatives:
+        News = frappe.qb.DocType("News")
+        frappe.qb.update(News).set(News.is_near_duplicate, 0).where(
+            News.name.isin(list(representatives.values()))
+        ).run()
+
+
+def remove_from_story_index(rows):
+    """
+    Forget deleted News rows: promote new representatives for the clusters they
+    listed and drop them from the index once the deletion is committed.
+    """
+    promote_story_representatives(row.story_cluster for row in rows if not row.is_near_duplicate)
+
+    content_hashes = [row.content_hash for row in rows if row.content_hash]
+    if content_hashes:
+        frappe.db.after_commit.add(lambda: StoryClusterIndex().remove(content_hashes))
+
+
+def on_news_delete(doc, method=None):
+    remove_from_story_index([doc])
@@ -0,0 +1,212 @@
+"""
+Article text extraction, run in worker processes.
+
+Kept free of frappe imports so spawned workers start quickly and never touch
+the site connection.
+"""
+
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import repeat
+
+from newspaper import Article
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+UNWANTED_KEYWORDS = (
+    "subscribe now",
+    "sign up",
+    "newsletter",
+    "exclusive offer",
+    "limited time offer",
+    "free trial",
+    "download now",
+    "join now",
+    "register today",
+    "special promotion",
+    "promotional offer",
+    "discount code",
+    "early access",
+    "sneak peek",
+    "save now",
+    "don't miss out",
+    "act now",
+    "last chance",
+    "expires soon",
+    "giveaway",
+    "free access",
+    "premium access",
+    "unlock full access",
+    "buy now",
+    "learn more",
+    "click here",
+    "follow us on",
+    "share this article",
+    "connect with us",
+    "advertisement",
+    "sponsored content",
+    "partner content",
+    "affiliate links",
+    "for more information",
+    "you may also like",
+    "we think you'll like",
+    "from our network",
+)
+
+VERIFY_MESSAGES = re.compile(
+    r"you are human|are you human|i'm not a robot|recaptcha", re.IGNORECASE
+)
+
+MIN_CONTENT_WORDS = 100
+
+
+@lru_cache(maxsize=32)
+def get_unwanted_pattern(filter_words=()):
+    """Compile every unwanted keyword into one case-insensitive alternation"""
+    keywords = {keyword.lower() for keyword in UNWANTED_KEYWORDS + tuple(filter_words) if keyword}
+    # Longest first so overlapping keywords resolve the same way every time
+    alternation = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+    return re.compile(alternation, re.IGNORECASE)
+
+
+def clean_text(text, filter_words=()):
+    """Drop short lines and lines containing promotional keywords"""
+    pattern = get_unwanted_pattern(tuple(filter_words))
+    cleaned_lines = []
+
+    for line in text.split("\n"):
+        line = line.strip()
+        if len(line.split()) > 4 and not pattern.search(line):
+            cleaned_lines.append(line)
+
+    return "\n".join(cleaned_lines)
+
+
+def extract_article_content(url, html, filter_words=()):
+    """Extract and clean the article text from an already downloaded page"""
+    if not html:
+        return {}
+
+    try:
+        news_article = Article(url)
+        news_article.download(input_html=html)
+        news_article.parse()
+
+        text = news_article.text
+
+        if not text:
+            print(f"Article content could not be parsed or is empty: {url}")
+            return {}
+
+        if VERIFY_MESSAGES.search(text):
+            print(f"Article requires human verification: {url}")
+            return {}
+
+        cleaned_text = clean_text(text, filter_words)
+
+        if len(cleaned_text.split()) < MIN_CONTENT_WORDS:
+            print(f"Article content is too short: {url}")
+            return {}
+
+        print(f"Successfully scraped article content from: {url}")
+
+        return {"content": cleaned_text}
+
+    except Exception as e:
+        print(f"Error getting article content: {str(e)}")
+        return {}
+
+
+def _limit_worker_memory(max_memory_mb):
+    """Cap the address space of a worker so one huge page cannot exhaust the host"""
+    if resource and max_memory_mb:
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+class ArticleParserPool:
+    """
+    Parse downloaded article pages in a pool of worker processes.
+
+    newspaper's parsing and the text cleanup are pure CPU work, so running them
+    in processes scales with cores instead of contending for the GIL. Workers
+    are spawned, not forked, so they never inherit the site connection; each
+    one is capped at `max_memory_mb` of address space. The pool is kept across
+    `extract_all` calls, so a run pays the spawn start-up once, and is
+    replaced after every `workers * max_tasks_per_child` pages so workers give
+    back fragmented memory regularly (the executor's own max_tasks_per_child
+    can deadlock on Python 3.11). With `workers` <= 1 pages are parsed inline.
+    Call `close` (or use it as a context manager) when done.
+    """
+
+    def __init__(self, workers=2, max_tasks_per_child=50, max_memory_mb=2048):
+        self.workers = max(0, workers)
+        self.max_tasks_per_child = max_tasks_per_child
+        self.max_memory_mb = max_memory_mb
+        self.executor = None
+        self.tasks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown()
+        self.executor = None
+        self.tasks = 0
+
+    def _remaining_tasks(self):
+        """Return how many pages the current pool may still parse, starting a new one if needed"""
+        budget = self.workers * self.max_tasks_per_child if self.max_tasks_per_child else None
+        if self.executor and budget and self.tasks >= budget:
+            self.close()
+
+        if not self.executor:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_limit_worker_memory,
+                initargs=(self.max_memory_mb,),
+            )
+        return budget - self.tasks if budget else None
+
+    def extract_all(self, pages, filter_words=()):
+        """Return the extracted content dict for every (url, html) pair in `pages`"""
+        pages = list(pages)
+        filter_words = tuple(filter_words)
+        results = [{} for _ in pages]
+        todo = [index for index, (_, html) in enumerate(pages) if html]
+
+        if self.workers <= 1:
+            for index in todo:
+                results[index] = extract_article_content(*pages[index], filter_words)
+            return results
+
+        while todo:
+            remaining = self._remaining_tasks() or len(todo)
+            chunk, todo = todo[:remaining], todo[remaining:]
+            self.tasks += len(chunk)
+            try:
+                extracted = self.executor.map(
+                    extract_article_content,
+                    [pages[index][0] for index in chunk],
+                    [pages[index][1] for index in chunk],
+                    repeat(filter_words),
+                )
+                for index, content_data in zip(chunk, extracted, strict=True):
+                    results[index] = content_data
+            except BrokenProcessPool as e:
+                # A worker died, usually by hitting the memory cap; keep what finished
+                print(f"Article parser pool stopped: {str(e)}")
+                self.close()
+
+        return results
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import pickle
+import time
+from contextlib import contextmanager
+
+import frappe
+
+FEED_CACHE_NAMESPACE = "crm:news_feed"
+FEED_CACHE_TTL = 6 * 3600
+
+
+def _key(*parts):
+    # Every key is site-prefixed here and then used with the raw redis commands,
+    # as the RedisWrapper helpers (hgetall, get_value, ...) would prefix it again
+    return frappe.cache.make_key(":".join((FEED_CACHE_NAMESPACE,) + parts))
+
+
+def get_feed_version():
+    """Return the counter bumped by every feed invalidation"""
+    return int(frappe.cache.get(_key("version")) or 0)
+
+
+def _entry_key(params):
+    # Relative periods move with the calendar day, so the day is part of the key
+    key = json.dumps({**params, "today": frappe.utils.today()}, sort_keys=True, default=str)
+    return _key("entry", str(get_feed_version()), hashlib.sha1(key.encode()).hexdigest())
+
+
+def _bump_version():
+    frappe.cache.incr(_key("version"))
+
+
+def invalidate_news_feed(doc=None, method=None):
+    """
+    Drop every cached feed response.
+
+    Bumping the version makes all entries unreachable in one O(1) write; the
+    stale ones simply expire. As a News / News Source doc event the bump waits
+    for the commit, so no request can cache the old rows under the new version.
+    Also called directly after bulk updates that bypass doc events.
+    """
+    if doc is not None:
+        frappe.db.after_commit.add(_bump_version)
+    else:
+        _bump_version()
+
+
+def get_cached_feed(params):
+    """Return the cached feed response for `params`, or None"""
+    value = frappe.cache.get(_entry_key(params))
+    return pickle.loads(value) if value is not None else None
+
+
+def set_cached_feed(params, response):
+    frappe.cache.set(_entry_key(params), pickle.dumps(response), ex=FEED_CACHE_TTL)
+
+
+@contextmanager
+def record_feed_request():
+    """Time a feed request; the body sets `stats["hit"]` to tell hits from misses"""
+    stats = {"hit": False}
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        outcome = "hits" if stats["hit"] else "misses"
+        pipeline = frappe.cache.pipeline()
+        pipeline.hincrby(_key("stats"), outcome, 1)
+        pipeline.hincrbyfloat(_key("stats"), f"{outcome}_seconds", time.perf_counter() - start)
+        pipeline.execute()
+
+
+def get_feed_cache_stats():
+    """Return the hit ratio and mean latency of cached and uncached feed requests"""
+    stats = frappe.cache.execute_command("HGETALL", _key("stats"))
+    raw = {key.decode(): float(value) for key, value in stats.items()}
+    hits, misses = raw.get("hits", 0), raw.get("misses", 0)
+
+    return {
+        "hits": int(hits),
+        "misses": int(misses),
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0,
+        "avg_hit_ms": round(raw.get("hits_seconds", 0) * 1000 / hits, 2) if hits else 0,
+        "avg_miss_ms": round(raw.get("misses_seconds", 0) * 1000 / misses, 2) if misses else 0,
+        "version": get_feed_version(),
+    }
+
+
+def reset_feed_cache_stats():
+    frappe.cache.delete(_key("stats"))
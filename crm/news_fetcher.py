@@ -0,0 +1,205 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+
+
+class TokenBucket:
+    """
+    Async token bucket allowing `rate` requests per second with bursts of `capacity`.
+
+    The bucket outlives event loops: its lock is recreated for each loop, so
+    the token count carries over from one `asyncio.run` to the next.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = None
+        self.loop = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.lock = asyncio.Lock()
+            self.loop = loop
+
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostState:
+    """Rate limit and backoff state shared by every request to one host"""
+
+    def __init__(self, rate, capacity):
+        self.bucket = TokenBucket(rate, capacity)
+        self.backoff_until = 0
+        self.backoff_level = 0
+
+    async def wait(self):
+        delay = self.backoff_until - time.monotonic()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.backoff_until - time.monotonic()
+        await self.bucket.acquire()
+
+    def throttle(self, retry_after, base_delay, max_delay):
+        """Push back every pending request to this host after a 429"""
+        self.backoff_level += 1
+        delay = retry_after or min(max_delay, base_delay * (2 ** self.backoff_level))
+        delay += random.uniform(0, base_delay)
+        self.backoff_until = max(self.backoff_until, time.monotonic() + delay)
+        return delay
+
+    def recover(self):
+        self.backoff_level = 0
+
+
+class ArticleContentFetcher:
+    """
+    Download article pages concurrently with per-host rate limiting.
+
+    Each host gets its own token bucket, so articles on different publishers are
+    fetched in parallel while a single publisher is never hit faster than
+    `rate_per_host`. A 429 from a host backs off every pending request to that
+    host instead of sleeping globally. `on_response(status, size)` is called
+    for every response received. Host state is kept between `fetch_all` calls,
+    so reuse one fetcher for a whole run. With a `circuit` (HostCircuitBreaker),
+    hosts whose circuit is open are skipped and 429s or captcha pages open it
+    for every other scraper process too.
+    """
+
+    def __init__(
+        self,
+        concurrency=10,
+        rate_per_host=0.5,
+        burst_per_host=2,
+        max_retries=3,
+        timeout=15,
+        backoff_base=2,
+        backoff_max=60,
+        headers=None,
+        on_response=None,
+        circuit=None,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.rate_per_host = rate_per_host
+        self.burst_per_host = burst_per_host
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.headers = headers or {}
+        self.on_response = on_response
+        self.circuit = circuit
+        self.hosts = {}
+
+    def _host_state(self, url):
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = HostState(self.rate_per_host, self.burst_per_host)
+        return self.hosts[host]
+
+    def _retry_after(self, response):
+        value = response.headers.get("Retry-After")
+        try:
+            return min(self.backoff_max, float(value)) if value else None
+        except ValueError:
+            return None
+
+    async def _fetch(self, session, semaphore, url):
+        host = urlparse(url).netloc
+        host_state = self._host_state(url)
+
+        for attempt in range(self.max_retries):
+            await host_state.wait()
+            if self.circuit and not self.circuit.allow(host):
+                print(f"Skipping article {url}: circuit open for {host}")
+                return None
+
+            try:
+                async with semaphore:
+                    async with session.get(url, allow_redirects=True) as response:
+                        if response.status != 200 and self.on_response:
+                            self.on_response(response.status, 0)
+                        if response.status != 200 and self.circuit:
+                            self.circuit.record_response(
+                                url, response.status, retry_after=self._retry_after(response)
+                            )
+
+                        if response.status == 429:
+                            delay = host_state.throttle(
+                                self._retry_after(response),
+                                self.backoff_base,
+                                self.backoff_max,
+                            )
+                            print(
+                                f"Rate limited by {host}. Backing off {delay:.1f}s "
+                                f"before retry {attempt+1}/{self.max_retries}"
+                            )
+                            continue
+
+                        if response.status != 200:
+                            print(f"Failed to download article {url}: {response.status}")
+                            return None
+
+                        host_state.recover()
+                        body = await response.read()
+                        if self.on_response:
+                            self.on_response(response.status, len(body))
+
+                        text = body.decode(response.get_encoding(), errors="ignore")
+                        if self.circuit:
+                            # A redirect to a consent or captcha page counts against the article's host
+                            self.circuit.record_response(
+                                url, response.status, text, location=str(response.url)
+                            )
+                        return text
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Error downloading article {url}: {str(e)}")
+                return None
+            except Exception as e:
+                # e.g. an unknown charset or a malformed URL; never fail the whole gather
+                print(f"Error processing article {url}: {str(e)}")
+                return None
+
+        return None
+
+    async def fetch_all_async(self, urls):
+        # Host state is kept, so rate limits and backoff hold across calls
+        semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+
+        async with aiohttp.ClientSession(
+            headers=self.headers, timeout=timeout, connector=connector
+        ) as session:
+            pages = await asyncio.gather(
+                *(self._fetch(session, semaphore, url) for url in urls)
+            )
+
+        return dict(zip(urls, pages, strict=True))
+
+    def fetch_all(self, urls):
+        """Download `urls` and return a dict of url -> HTML (None on failure)"""
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return {}
+        return asyncio.run(self.fetch_all_async(urls))
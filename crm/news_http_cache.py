@@ -0,0 +1,95 @@
+import copy
+import hashlib
+import time
+
+import frappe
+
+
+class CachedResponse:
+    """Minimal response returned by HTTPCache, whether it came from the network or the cache"""
+
+    def __init__(self, url, status_code, text, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.from_cache = from_cache
+        self.body_hash = hashlib.sha1(text.encode("utf-8")).hexdigest() if text else ""
+
+
+class HTTPCache:
+    """
+    Conditional-GET cache in front of a requests session, stored in the site cache.
+
+    Bodies are kept with their ETag / Last-Modified validators. Within
+    `freshness` seconds a cached body is returned without any request; after
+    that a conditional request is sent and a 304 reuses the stored body.
+    Parsed results can be stored next to a body with `set_parsed` and are
+    returned by `get_parsed` as long as the body has not changed.
+    """
+
+    def __init__(self, session, freshness=900, ttl=2 * 24 * 3600, namespace="crm:news_http"):
+        self.session = session
+        self.freshness = freshness
+        self.ttl = ttl
+        self.namespace = namespace
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _key(self, kind, url):
+        return f"{self.namespace}:{kind}:{hashlib.sha1(url.encode('utf-8')).hexdigest()}"
+
+    def get(self, url, **kwargs):
+        entry = frappe.cache.get_value(self._key("body", url))
+
+        if entry and time.time() - entry["fetched_at"] < self.freshness:
+            self.hits += 1
+            return CachedResponse(url, 200, entry["body"], from_cache=True)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self.revalidated += 1
+            entry["fetched_at"] = time.time()
+            frappe.cache.set_value(self._key("body", url), entry, expires_in_sec=self.ttl)
+            return CachedResponse(url, 200, entry["body"], from_cache=True)
+
+        self.misses += 1
+        if response.status_code == 200:
+            frappe.cache.set_value(
+                self._key("body", url),
+                {
+                    "body": response.text,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                },
+                expires_in_sec=self.ttl,
+            )
+
+        return CachedResponse(url, response.status_code, response.text)
+
+    def get_parsed(self, response):
+        """Return the parse stored for this exact body, if any"""
+        if not response.from_cache:
+            return None
+        entry = frappe.cache.get_value(self._key("parsed", response.url))
+        if entry and entry["body_hash"] == response.body_hash:
+            return copy.deepcopy(entry["value"])
+        return None
+
+    def set_parsed(self, response, value):
+        if response.status_code != 200:
+            return
+        frappe.cache.set_value(
+            self._key("parsed", response.url),
+            {"body_hash": response.body_hash, "value": copy.deepcopy(value)},
+            expires_in_sec=self.ttl,
+        )
@@ -0,0 +1,232 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import frappe
+import requests
+from PIL import Image, ImageOps
+
+from crm.news_feed_cache import invalidate_news_feed
+
+IMAGE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+    "image/avif": "avif",
+}
+
+# Pillow format name -> file extension
+IMAGE_FORMATS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "WEBP": "webp",
+    "GIF": "gif",
+    "AVIF": "avif",
+}
+
+# Variant name -> maximum width; news cards render 250-400 CSS pixels wide
+IMAGE_VARIANTS = {"small": 320, "medium": 640}
+WEBP_QUALITY = 80
+IMAGE_VARIANTS_CACHE_TTL = 30 * 24 * 3600
+
+
+def get_image_variants_key(file_url):
+    """Return the site cache key holding the variants JSON of a stored image"""
+    return frappe.cache.make_key(f"crm:news_image_variants:{file_url}")
+
+
+def detect_image_extension(content, content_type=""):
+    """Return the file extension of the image format found in `content`"""
+    try:
+        with Image.open(BytesIO(content)) as image:
+            if image.format in IMAGE_FORMATS:
+                return IMAGE_FORMATS[image.format]
+    except Exception:
+        pass
+
+    # Formats Pillow cannot read fall back to the declared Content-Type
+    return IMAGE_EXTENSIONS.get(content_type.lower(), "jpg")
+
+
+def build_image_variants(content):
+    """
+    Return {variant: (webp_bytes, width, height)} for an image.
+
+    The image is rotated according to its EXIF orientation and re-encoded
+    without EXIF, ICC or XMP data. Variants are never upscaled.
+    """
+    with Image.open(BytesIO(content)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in image.getbands() or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        variants = {}
+        for name, max_width in IMAGE_VARIANTS.items():
+            variant = image.copy()
+            if variant.width > max_width:
+                height = max(1, round(variant.height * max_width / variant.width))
+                variant = variant.resize((max_width, height), Image.LANCZOS)
+
+            buffer = BytesIO()
+            variant.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+            variants[name] = (buffer.getvalue(), variant.width, variant.height)
+
+        return variants
+
+
+class NewsImageIngestor:
+    """
+    Download news thumbnails concurrently and store them as content-addressed files.
+
+    Every image is named after the SHA-256 of its bytes, so a thumbnail Google
+    serves for several syndicated stories is written to disk once and the same
+    File is reused for every article.
+    """
+
+    def __init__(self, workers=8, timeout=15, on_response=None):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.file_urls = {}
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.workers, pool_maxsize=self.workers
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+                "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.5",
+                "Referer": "https://news.google.com/",
+            }
+        )
+        if on_response:
+            self.session.hooks["response"].append(
+                lambda response, *args, **kwargs: on_response(
+                    response.status_code, len(response.content)
+                )
+            )
+
+    def _download(self, image_url):
+        try:
+            response = self.session.get(
+                image_url, allow_redirects=True, timeout=self.timeout
+            )
+            if response.status_code != 200 or not response.content:
+                print(f"Failed to download image {image_url}: {response.status_code}")
+                return None
+
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+            return response.content, detect_image_extension(response.content, content_type)
+
+        except Exception as e:
+            print(f"Error downloading image {image_url}: {str(e)}")
+            return None
+
+    def _save(self, content, extension):
+        """Return the URL of the public File holding `content`, creating it if needed"""
+        content_hash = hashlib.sha256(content).hexdigest()
+        if content_hash in self.file_urls:
+            return self.file_urls[content_hash]
+
+        file_name = f"news_{content_hash[:32]}.{extension}"
+        file_url = frappe.db.get_value(
+            "File", {"file_name": file_name, "is_private": 0}, "file_url"
+        )
+
+        if not file_url:
+            file_doc = frappe.get_doc(
+                {
+                    "doctype": "File",
+                    "file_name": file_name,
+                    "content": content,
+                    "is_private": 0,
+                }
+            ).insert(ignore_permissions=True)
+            file_url = file_doc.file_url
+
+        self.file_urls[content_hash] = file_url
+        return file_url
+
+    def ingest(self, image_urls):
+        """Download `image_urls` and return a dict of image URL -> stored file URL"""
+        image_urls = list(dict.fromkeys(url for url in image_urls if url))
+        if not image_urls:
+            return {}
+
+        print(f"Downloading {len(image_urls)} images with {self.workers} workers")
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(image_urls))) as executor:
+            downloads = list(executor.map(self._download, image_urls))
+
+        # Files are written from the calling thread, which owns the DB connection
+        stored = {}
+        for image_url, download in zip(image_urls, downloads, strict=True):
+            if not download:
+                continue
+            try:
+                stored[image_url] = self._save(*download)
+            except Exception as e:
+                print(f"Error saving image {image_url}: {str(e)}")
+
+        return stored
+
+    def build_variants(self, file_url):
+        """Store the WebP variants of a stored image and return their URLs and sizes"""
+        content = frappe.get_doc("File", {"file_url": file_url}).get_content()
+
+        return {
+            name: {"url": self._save(variant, "webp"), "width": width, "height": height}
+            for name, (variant, width, height) in build_image_variants(content).items()
+        }
+
+
+def optimize_news_images(news_names):
+    """
+    Background job generating the responsive WebP variants of News images.
+
+    Runs after the articles are stored, so the scrape itself never waits on
+    image encoding. Variants already built for the same file by an earlier
+    article are reused from the site cache, keyed by the file URL; on a miss
+    they are re-encoded, and the content-addressed variant Files are reused.
+    """
+    rows = frappe.get_all(
+        "News",
+        filters={"name": ["in", news_names], "image": ["is", "set"]},
+        fields=["name", "image"],
+    )
+    ingestor = NewsImageIngestor()
+    variants_by_image = {}
+    built = {}
+
+    for row in rows:
+        if row.image not in variants_by_image:
+            variants = frappe.cache.get(get_image_variants_key(row.image))
+            if variants:
+                variants = variants.decode()
+            else:
+                try:
+                    variants = built[row.image] = json.dumps(ingestor.build_variants(row.image))
+                except Exception as e:
+                    print(f"Error optimizing image {row.image}: {str(e)}")
+            variants_by_image[row.image] = variants
+
+        if variants_by_image[row.image]:
+            frappe.db.set_value(
+                "News", row.name, "image_variants", variants_by_image[row.image], update_modified=False
+            )
+
+    frappe.db.commit()
+
+    # Only cache variants whose Files are committed
+    pipeline = frappe.cache.pipeline()
+    for file_url, variants in built.items():
+        pipeline.set(get_image_variants_key(file_url), variants, ex=IMAGE_VARIANTS_CACHE_TTL)
+    pipeline.execute()
+
+    invalidate_news_feed()
@@ -0,0 +1,62 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+class ScrapeMetrics:
+    """
+    Thread-safe timings and counters for one scrape.
+
+    Wrap work in `stage(name)` to time it; repeated stages accumulate. HTTP
+    responses from any client are reported through `record_response`, and
+    problems that should not abort the scrape are appended to `errors`.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.statuses = Counter()
+        self.bytes_downloaded = 0
+        self.counters = Counter()
+        self.errors = []
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                seconds, calls = self.stages.get(name, (0, 0))
+                self.stages[name] = (seconds + elapsed, calls + 1)
+
+    def record_response(self, status_code, size=0):
+        with self.lock:
+            self.statuses[status_code] += 1
+            self.bytes_downloaded += size or 0
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    @property
+    def requests(self):
+        return sum(self.statuses.values())
+
+    def hit_rate(self, hits_counter, misses_counter):
+        lookups = self.counters[hits_counter] + self.counters[misses_counter]
+        return round(100 * self.counters[hits_counter] / lookups, 1) if lookups else 0
+
+    def as_dict(self):
+        return {
+            "stages": {
+                name: {"seconds": round(seconds, 3), "calls": calls}
+                for name, (seconds, calls) in self.stages.items()
+            },
+            "requests_by_status": {str(status): count for status, count in self.statuses.items()},
+            "bytes_downloaded": self.bytes_downloaded,
+            "counters": dict(self.counters),
+            "errors": list(self.errors),
+        }
@@ -0,0 +1,435 @@
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+
+from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+
+
+def _split_rss_title(title_text):
+    # Remove source part if it exists (format: "Title - Source")
+    if " - " in title_text:
+        parts = title_text.split(" - ")
+        return " - ".join(parts[:-1])  # Join all parts except the last one (source)
+    return title_text
+
+
+def _rss_datetime(pub_date):
+    """Convert an RFC 822 pubDate to the ISO format used by the search page"""
+    if not pub_date:
+        return ""
+    try:
+        parsed = parsedate_to_datetime(pub_date.strip())
+    except (TypeError, ValueError):
+        return ""
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _rss_article(title, link, pub_date, source_name, source_url):
+    return {
+        "title": title,
+        "link": link or "",
+        "image": "",
+        "source": source_name,
+        "source_url": source_url,
+        "favicon": "",
+        "datetime": _rss_datetime(pub_date),
+        "time": pub_date or "",
+        "articleType": "rss",
+    }
+
+
+class BaseParser:
+    """Turns Google News search pages and RSS feeds into article dicts"""
+
+    name = None
+
+    def __init__(self, base_url="https://news.google.com"):
+        self.base_url = base_url.rstrip("/")
+
+    def _google_url(self, url):
+        if url and url.startswith("/"):
+            return f"{self.base_url}{url}"
+        return url
+
+    def parse_search_page(self, html_content):
+        raise NotImplementedError
+
+    def parse_rss(self, xml_content):
+        raise NotImplementedError
+
+
+class SoupParser(BaseParser):
+    """BeautifulSoup/CSS-selector parser for Google News pages"""
+
+    name = "bs4"
+
+    def _get_article_type(self, article):
+        if article.select("h4") or article.select("div > div + div > div a"):
+            return "regular"
+        if article.select("figure"):
+            return "topicFeatured"
+        if article.select("> a"):
+            return "topicSmall"
+        return ""
+
+    def _get_title(self, article, article_type):
+        try:
+            if article_type == "regular":
+                return (
+                    article.select_one("h4").text
+                    if article.select_one("h4")
+                    else (
+                        article.select_one("div > div + div > div a").text
+                        if article.select_one("div > div + div > div a")
+                        else ""
+                    )
+                )
+            if article_type == "topicFeatured" or article_type == "topicSmall":
+                return (
+                    article.select_one('a[target="_blank"]').text
+                    if article.select_one('a[target="_blank"]')
+                    else (
+                        article.select_one("button")["aria-label"].replace(
+                            "More - ", ""
+                        )
+                        if article.select_one("button")
+                        and "aria-label" in article.select_one("button").attrs
+                        else ""
+                    )
+                )
+            return ""
+        except Exception:
+            return ""
+
+    def parse_search_page(self, html_content):
+        soup = BeautifulSoup(html_content, "html.parser")
+
+        articles_elements = soup.select("article")
+        print(f"Found {len(articles_elements)} article elements")
+
+        results = []
+
+        for article_elem in articles_elements:
+            # Extract link
+            link_elem = article_elem.select_one(
+                'a[href^="./article"]'
+            ) or article_elem.select_one('a[href^="./read"]')
+            if not link_elem:
+                continue
+
+            link = link_elem["href"].replace("./", f"{self.base_url}/")
+
+            # Extract image
+            img_elem = article_elem.select_one("figure img")
+            image = ""
+            if img_elem:
+                if "srcset" in img_elem.attrs:
+                    srcset = img_elem["srcset"].split()
+                    if len(srcset) >= 2:
+                        image = srcset[-2]
+                elif "src" in img_elem.attrs:
+                    image = img_elem["src"]
+
+            # Get article type and title
+            article_type = self._get_article_type(article_elem)
+            title = self._get_title(article_elem, article_type)
+
+            if not title:
+                continue
+
+            # Get source and time
+            source_elem = article_elem.select_one("div[data-n-tid]")
+            source = source_elem.text if source_elem else ""
+
+            # Extract favicon directly from Google's results
+            favicon = ""
+            favicon_elem = article_elem.select_one("img.qEdqNd")
+            if favicon_elem:
+                if "src" in favicon_elem.attrs:
+                    favicon = favicon_elem["src"]
+                elif "srcset" in favicon_elem.attrs:
+                    srcset = favicon_elem["srcset"].split()
+                    if srcset:
+                        favicon = srcset[0]
+
+            time_elem = article_elem.select_one("div:last-child time")
+            time_text = time_elem.text if time_elem else ""
+            datetime_attr = (
+                time_elem["datetime"]
+                if time_elem and "datetime" in time_elem.attrs
+                else ""
+            )
+
+            results.append(
+                {
+                    "title": title,
+                    "link": link,
+                    "image": self._google_url(image),
+                    "source": source,
+                    "source_url": "",
+                    "favicon": self._google_url(favicon),
+                    "datetime": datetime_attr,
+                    "time": time_text,
+                    "articleType": article_type,
+                }
+            )
+
+        # Release the tree now rather than whenever the GC gets to it
+        soup.decompose()
+        return results
+
+    def parse_rss(self, xml_content):
+        soup = BeautifulSoup(xml_content, "xml")
+
+        items = soup.find_all("item")
+        print(f"Found {len(items)} RSS items")
+
+        results = []
+
+        for item in items:
+            title_elem = item.find("title")
+            if not title_elem:
+                continue
+
+            # Extract the actual article title (not including source)
+            title = _split_rss_title(title_elem.text)
+
+            # Extract source from the description field if available
+            description = item.find("description")
+            source_name = ""
+            if description:
+                # Parse the HTML in description
+                desc_soup = BeautifulSoup(description.text, "html.parser")
+                font_elem = desc_soup.find("font", color="#6f6f6f")
+                if font_elem:
+                    source_name = font_elem.text.strip()
+
+            # Extract source url from the source element
+            source_elem = item.find("source")
+            source_url = ""
+            if source_elem and "url" in source_elem.attrs:
+                source_url = source_elem["url"]
+                # If no source name was found in description, use the source element text
+                if not source_name and source_elem.text:
+                    source_name = source_elem.text
+
+            link_elem = item.find("link")
+            pub_date_elem = item.find("pubDate")
+
+            if title:
+                results.append(
+                    _rss_article(
+                        title,
+                        link_elem.text.strip() if link_elem else "",
+                        pub_date_elem.text if pub_date_elem else "",
+                        source_name,
+                        source_url,
+                    )
+                )
+
+        soup.decompose()
+        return results
+
+
+class LxmlParser(BaseParser):
+    """
+    lxml/XPath parser for Google News pages.
+
+    Produces the same article dicts as SoupParser. The XPath expressions are
+    compiled once and mirror the CSS selectors used there.
+    """
+
+    name = "lxml"
+
+    articles = etree.XPath("//article")
+    article_link = etree.XPath(
+        "(.//a[starts-with(@href, './article')] | .//a[starts-with(@href, './read')])"
+    )
+    figure_img = etree.XPath(".//figure//img")
+    h4 = etree.XPath(".//h4")
+    # Like soupsieve, ancestors in these two selectors may sit outside the article
+    nested_link = etree.XPath(
+        ".//a[ancestor::div[parent::div[preceding-sibling::*[1][self::div] and parent::div]]]"
+    )
+    figure = etree.XPath(".//figure")
+    direct_link = etree.XPath("./a")
+    blank_link = etree.XPath(".//a[@target='_blank']")
+    button = etree.XPath(".//button")
+    source = etree.XPath(".//div[@data-n-tid]")
+    favicon = etree.XPath(
+        ".//img[contains(concat(' ', normalize-space(@class), ' '), ' qEdqNd ')]"
+    )
+    time = etree.XPath(".//time[ancestor::div[not(following-sibling::*)]]")
+
+    rss_items = etree.XPath("//item")
+    rss_source_font = etree.XPath("//font[@color='#6f6f6f']")
+
+    def _first(self, xpath, element):
+        matches = xpath(element)
+        return matches[0] if matches else None
+
+    def _text(self, element):
+        return "".join(element.itertext()) if element is not None else ""
+
+    def _first_link(self, element):
+        # Prefer ./article links like the CSS version does
+        links = self.article_link(element)
+        for link in links:
+            if link.get("href", "").startswith("./article"):
+                return link
+        return links[0] if links else None
+
+    def _get_article_type(self, article):
+        if self.h4(article) or self.nested_link(article):
+            return "regular"
+        if self.figure(article):
+            return "topicFeatured"
+        if self.direct_link(article):
+            return "topicSmall"
+        return ""
+
+    def _get_title(self, article, article_type):
+        if article_type == "regular":
+            element = self._first(self.h4, article)
+            if element is None:
+                element = self._first(self.nested_link, article)
+            return self._text(element)
+
+        if article_type in ("topicFeatured", "topicSmall"):
+            element = self._first(self.blank_link, article)
+            if element is not None:
+                return self._text(element)
+            button = self._first(self.button, article)
+            if button is not None and button.get("aria-label") is not None:
+                return button.get("aria-label").replace("More - ", "")
+
+        return ""
+
+    def parse_search_page(self, html_content):
+        tree = lxml_html.document_fromstring(html_content)
+
+        articles_elements = self.articles(tree)
+        print(f"Found {len(articles_elements)} article elements")
+
+        results = []
+
+        for article_elem in articles_elements:
+            link_elem = self._first_link(article_elem)
+            if link_elem is None:
+                continue
+
+            link = link_elem.get("href").replace("./", f"{self.base_url}/")
+
+            image = ""
+            img_elem = self._first(self.figure_img, article_elem)
+            if img_elem is not None:
+                if img_elem.get("srcset") is not None:
+                    srcset = img_elem.get("srcset").split()
+                    if len(srcset) >= 2:
+                        image = srcset[-2]
+                elif img_elem.get("src") is not None:
+                    image = img_elem.get("src")
+
+            article_type = self._get_article_type(article_elem)
+            title = self._get_title(article_elem, article_type)
+
+            if not title:
+                continue
+
+            source = self._text(self._first(self.source, article_elem))
+
+            favicon = ""
+            favicon_elem = self._first(self.favicon, article_elem)
+            if favicon_elem is not None:
+                if favicon_elem.get("src") is not None:
+                    favicon = favicon_elem.get("src")
+                elif favicon_elem.get("srcset") is not None:
+                    srcset = favicon_elem.get("srcset").split()
+                    if srcset:
+                        favicon = srcset[0]
+
+            time_elem = self._first(self.time, article_elem)
+
+            results.append(
+                {
+                    "title": title,
+                    "link": link,
+                    "image": self._google_url(image),
+                    "source": source,
+                    "source_url": "",
+                    "favicon": self._google_url(favicon),
+                    "datetime": time_elem.get("datetime", "") if time_elem is not None else "",
+                    "time": self._text(time_elem),
+                    "articleType": article_type,
+                }
+            )
+
+        # Drop the tree so large result pages do not linger in memory
+        tree.clear()
+        del articles_elements, tree
+        return results
+
+    def parse_rss(self, xml_content):
+        if isinstance(xml_content, str):
+            xml_content = xml_content.encode("utf-8")
+
+        parser = etree.XMLParser(recover=True, resolve_entities=False, no_network=True)
+        tree = etree.fromstring(xml_content, parser)
+
+        items = self.rss_items(tree) if tree is not None else []
+        print(f"Found {len(items)} RSS items")
+
+        results = []
+
+        for item in items:
+            title_text = item.findtext("title")
+            if title_text is None:
+                continue
+
+            title = _split_rss_title(title_text)
+
+            source_name = ""
+            description = item.findtext("description")
+            if description:
+                fragment = lxml_html.fragment_fromstring(description, create_parent="div")
+                font_elem = self._first(self.rss_source_font, fragment)
+                if font_elem is not None:
+                    source_name = self._text(font_elem).strip()
+
+            source_url = ""
+            source_elem = item.find("source")
+            if source_elem is not None and source_elem.get("url") is not None:
+                source_url = source_elem.get("url")
+                if not source_name and source_elem.text:
+                    source_name = source_elem.text
+
+            if title:
+                results.append(
+                    _rss_article(
+                        title,
+                        (item.findtext("link") or "").strip(),
+                        item.findtext("pubDate"),
+                        source_name,
+                        source_url,
+                    )
+                )
+
+            item.clear()
+
+        del items, tree
+        return results
+
+
+PARSER_BACKENDS = {
+    SoupParser.name: SoupParser,
+    LxmlParser.name: LxmlParser,
+}
+
+
+def get_parser(name, base_url="https://news.google.com"):
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown news parser backend: {name}")
+    return PARSER_BACKENDS[name](base_url)
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+
+import frappe
+
+
+class RedirectCache:
+    """
+    LRU cache of Google News article token -> publisher URL that survives between runs.
+
+    Recently used tokens are kept in an in-process LRU, backed by the site
+    cache. Every hit pushes the entry's expiry forward, so links that keep
+    appearing in the daily window stay cached while stale ones age out.
+    Must be used from the thread that owns the site connection.
+    """
+
+    def __init__(self, max_entries=5000, ttl=14 * 24 * 3600, namespace="crm:news_redirect"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.namespace = namespace
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, token):
+        return f"{self.namespace}:{token}"
+
+    def _remember(self, token, url):
+        self.entries[token] = url
+        self.entries.move_to_end(token)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, token):
+        url = self.entries.get(token)
+        if url is None:
+            url = frappe.cache.get_value(self._key(token))
+
+        if url is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._remember(token, url)
+        frappe.cache.set_value(self._key(token), url, expires_in_sec=self.ttl)
+        return url
+
+    def set(self, token, url):
+        self._remember(token, url)
+        frappe.cache.set_value(self._key(token), url, expires_in_sec=self.ttl)
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+        }
@@ -0,0 +1,182 @@
+import json
+
+import frappe
+from frappe.query_builder.functions import Coalesce
+
+from crm.news_clusters import remove_from_story_index
+from crm.news_feed_cache import invalidate_news_feed
+from crm.news_images import get_image_variants_key
+
+ARCHIVE_FIELDS = [
+    "news_title",
+    "title",
+    "link",
+    "content_hash",
+    "source",
+    "published_date",
+    "search_config",
+    "category",
+    "content",
+]
+
+
+def get_retention_policies():
+    """Return (search config or None, days, action) for every policy that removes articles"""
+    settings = frappe.get_cached_doc("News Scraper Settings")
+    policies = [
+        (config.name, config.retention_days, config.retention_action or "Delete")
+        for config in frappe.get_all(
+            "News Search Config",
+            filters={"retention_days": [">", 0]},
+            fields=["name", "retention_days", "retention_action"],
+        )
+    ]
+
+    if settings.default_retention_days:
+        policies.append(
+            (None, settings.default_retention_days, settings.default_retention_action or "Delete")
+        )
+
+    return policies
+
+
+def _get_expired_batch(search_config, cutoff, after, batch_size):
+    """Return the next `batch_size` expired articles, ordered by (published_date, name)"""
+    News = frappe.qb.DocType("News")
+    query = (
+        frappe.qb.from_(News)
+        .select(
+            News.name,
+            News.image,
+            News.image_variants,
+            News.story_cluster,
+            News.is_near_duplicate,
+            *(News.field(f) for f in ARCHIVE_FIELDS),
+        )
+        .where(News.published_date < cutoff)
+        .orderby(News.published_date)
+        .orderby(News.name)
+        .limit(batch_size)
+    )
+
+    if search_config:
+        query = query.where(News.search_config == search_config)
+    else:
+        query = query.where(Coalesce(News.search_config, "") == "")
+
+    if after:
+        last_date, last_name = after
+        query = query.where(
+            (News.published_date > last_date)
+            | ((News.published_date == last_date) & (News.name > last_name))
+        )
+
+    return query.run(as_dict=True)
+
+
+def _archive(rows):
+    now = frappe.utils.now()
+    user = frappe.session.user
+    frappe.db.bulk_insert(
+        "News Archive",
+        fields=["name", "creation", "modified", "owner", "modified_by", "archived_on", *ARCHIVE_FIELDS],
+        values=[
+            (frappe.generate_hash(), now, now, user, user, now, *(row[f] for f in ARCHIVE_FIELDS))
+            for row in rows
+        ],
+    )
+
+
+def _delete_unused_files(rows):
+    """Delete the images and variants of removed articles that no other article uses"""
+    image_urls = {row.image for row in rows if row.image}
+    if image_urls:
+        image_urls -= set(
+            frappe.get_all("News", filters={"image": ["in", list(image_urls)]}, pluck="image")
+        )
+
+    # Variants are encoded from their original's bytes, so they fall out of use with it
+    variant_urls = set()
+    for row in rows:
+        if row.image in image_urls:
+            variants = json.loads(row.image_variants) if isinstance(row.image_variants, str) else row.image_variants
+            variant_urls.update(variant["url"] for variant in (variants or {}).values())
+
+    file_urls = list(image_urls | variant_urls)
+    if not file_urls:
+        return 0, 0
+
+    if image_urls:
+        frappe.cache.delete(*(get_image_variants_key(url) for url in image_urls))
+
+    files = frappe.get_all(
+        "File",
+        filters={"file_url": ["in", file_urls], "is_private": 0},
+        fields=["name", "file_size"],
+    )
+    for file in files:
+        frappe.delete_doc("File", file.name, ignore_permissions=True, delete_permanently=True)
+
+    return len(files), sum(file.file_size or 0 for file in files)
+
+
+def apply_retention_policy(search_config, days, action, batch_size=500):
+    """
+    Remove the articles of one policy published more than `days` days ago.
+
+    Articles are walked in (published_date, name) order with a keyset cursor
+    and removed `batch_size` at a time, committing after every batch so no
+    transaction holds locks on News for long.
+    """
+    cutoff = frappe.utils.add_days(frappe.utils.now_datetime(), -days)
+    report = frappe._dict(rows=0, files=0, bytes=0)
+    after = None
+
+    while True:
+        rows = _get_expired_batch(search_config, cutoff, after, batch_size)
+        if not rows:
+            break
+
+        if action == "Archive":
+            _archive(rows)
+
+        frappe.db.delete("News", {"name": ["in", [row.name for row in rows]]})
+        remove_from_story_index(rows)
+        files, freed = _delete_unused_files(rows)
+        frappe.db.commit()
+        # Bulk deletes skip doc events
+        invalidate_news_feed()
+
+        report.rows += len(rows)
+        report.files += files
+        report.bytes += freed
+        after = (rows[-1].published_date, rows[-1].name)
+
+    return report
+
+
+def apply_news_retention():
+    """Daily job applying every News retention policy and recording what was freed"""
+    batch_size = frappe.get_cached_doc("News Scraper Settings").retention_batch_size or 500
+    total = frappe._dict(rows=0, files=0, bytes=0)
+
+    for search_config, days, action in get_retention_policies():
+        report = apply_retention_policy(search_config, days, action, batch_size)
+        print(
+            f"Retention for {search_config or 'unassigned articles'}: {action.lower()}d "
+            f"{report.rows} articles, removed {report.files} files ({report.bytes} bytes)"
+        )
+        for key in total:
+            total[key] += report[key]
+
+    frappe.db.set_single_value(
+        "News Scraper Settings",
+        {
+            "last_retention_run": frappe.utils.now_datetime(),
+            "last_retention_rows": total.rows,
+            "last_retention_files": total.files,
+            "last_retention_bytes": total.bytes,
+        },
+    )
+    frappe.db.commit()
+    return total
@@ -1,17 +1,82 @@
-import requests
-import time
-import random
-from bs4 import BeautifulSoup
-from urllib.parse import urlencode
 import base64
-from newspaper import Article
-import re
 import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urlparse
+
 import frappe
+import requests
+from frappe.utils.background_jobs import is_job_enqueued
+
+from crm.crm.doctype.news.news import get_content_hash, get_link_hash, normalize_title
+from crm.crm.doctype.news_scrape_run.news_scrape_run import start_scrape_run
+from crm.news_circuit import HostCircuitBreaker, parse_retry_after
+from crm.news_clusters import StoryClusterIndex
+from crm.news_extraction import ArticleParserPool
+from crm.news_fetcher import ArticleContentFetcher
+from crm.news_http_cache import CachedResponse, HTTPCache
+from crm.news_images import NewsImageIngestor
+from crm.news_metrics import ScrapeMetrics
+from crm.news_parsers import get_parser
+from crm.news_redirects import RedirectCache
+
+
+def _read_varint(data, position):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+
+def decode_article_token(token):
+    """
+    Return the publisher URL of an old-style Google News article token, or None.
+
+    The token is URL-safe base64 of a protobuf message whose field 4 (tag
+    0x22) holds the URL, length-prefixed by a varint. Newer tokens carry no
+    URL and must be resolved over the network.
+    """
+    try:
+        data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        position = 0
+        while position < len(data):
+            tag, position = _read_varint(data, position)
+            field, wire_type = tag >> 3, tag & 0x07
+
+            if wire_type == 0:
+                _, position = _read_varint(data, position)
+            elif wire_type == 1:
+                position += 8
+            elif wire_type == 5:
+                position += 4
+            elif wire_type == 2:
+                length, position = _read_varint(data, position)
+                value = data[position : position + length]
+                position += length
+                if field == 4:
+                    url = value.decode("utf-8")
+                    parsed = urlparse(url)
+                    if parsed.scheme in ("http", "https") and parsed.netloc and url.isprintable():
+                        return url
+                    return None
+            else:
+                return None
+    except (ValueError, IndexError):
+        pass
+
+    return None
 
 
 class GoogleNewsScraper:
-    def __init__(self, config=None):
+    def __init__(self, config=None, metrics=None):
         self.config = {
             "prettyURLs": True,
             "getArticleContent": False,
@@ -20,12 +85,68 @@ class GoogleNewsScraper:
             "queryVars": {},
             "filterWords": [],
             "limit": 99,
+            "urlWorkers": 8,
+            "urlPerHostLimit": 4,
+            "requestTimeout": 10,
+            "contentConcurrency": 10,
+            "contentRatePerHost": 0.5,
+            "contentBurstPerHost": 2,
+            "contentMaxRetries": 3,
+            "contentTimeout": 15,
+            "contentWorkers": min(4, os.cpu_count() or 1),
+            "contentWorkerMaxTasks": 50,
+            "contentWorkerMemoryMB": 2048,
+            "streamBatchSize": 20,
+            "circuitBreaker": True,
+            "circuitBaseDelay": 30,
+            "circuitMaxDelay": 3600,
+            "httpCache": True,
+            "cacheFreshness": 900,
+            "parser": "lxml",
+            "requireImages": True,
+            "redirectCache": True,
+            "redirectCacheSize": 5000,
+            "since": None,
+            "seenLinkHash": None,
+            "sinceGrace": 3600,
+            "baseURL": "https://news.google.com",
         }
 
         if config:
             self.config.update(config)
 
+        self.parser = get_parser(self.config["parser"], self.config["baseURL"])
+
+        self.redirect_cache = None
+        if self.config["redirectCache"]:
+            self.redirect_cache = RedirectCache(max_entries=self.config["redirectCacheSize"])
+        self.redirect_stats = {"decoded": 0, "network": 0, "failed": 0}
+        # Stage timings and response counts, shared with the caller when given
+        self.metrics = metrics or ScrapeMetrics()
+        self.errors = self.metrics.errors
+
+        self.content_fetcher = None
+        self.parser_pool = None
+
+        self.circuit = None
+        if self.config["circuitBreaker"]:
+            self.circuit = HostCircuitBreaker(
+                base_delay=self.config["circuitBaseDelay"],
+                max_delay=self.config["circuitMaxDelay"],
+            )
+
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+
         self.session = requests.Session()
+        # Size the connection pool so concurrent workers can reuse connections
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.config["urlWorkers"],
+            pool_maxsize=self.config["urlWorkers"],
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.hooks["response"].append(self._record_response)
         self.session.headers.update(
             {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -38,211 +159,317 @@ class GoogleNewsScraper:
             }
         )
 
+        self.http_cache = None
+        if self.config["httpCache"]:
+            self.http_cache = HTTPCache(self.session, freshness=self.config["cacheFreshness"])
+
+    def _record_response(self, response, *args, **kwargs):
+        self.metrics.record_response(response.status_code, len(response.content))
+
+        if self.circuit:
+            # Runs on worker threads too, so only the in-process state is touched
+            self.circuit.record_response(
+                response.url,
+                response.status_code,
+                "" if response.is_redirect else response.text,
+                parse_retry_after(response.headers.get("Retry-After")),
+                response.headers.get("Location", ""),
+            )
+
+    def _record_cache_stats(self):
+        if self.http_cache:
+            self.metrics.increment("http_cache_hits", self.http_cache.hits + self.http_cache.revalidated)
+            self.metrics.increment("http_cache_revalidated", self.http_cache.revalidated)
+            self.metrics.increment("http_cache_misses", self.http_cache.misses)
+
+        for outcome in ("decoded", "network", "failed"):
+            self.metrics.increment(f"redirects_{outcome}", self.redirect_stats[outcome])
+        if self.redirect_cache:
+            self.metrics.increment("redirect_cache_hits", self.redirect_cache.hits)
+            self.metrics.increment("redirect_cache_misses", self.redirect_cache.misses)
+
+        if self.circuit:
+            self.metrics.increment("circuit_opened", self.circuit.opened)
+            self.metrics.increment("circuit_rejected", self.circuit.rejected)
+
     def _build_query_string(self, query_vars):
         if not query_vars:
             return ""
         return "?" + urlencode(query_vars)
 
+    def _article_token(self, url):
+        """Return the Google News article token of a /read/ or /articles/ link"""
+        base64_match = re.search(r"/(?:read|articles)/([A-Za-z0-9-_]+)", url or "")
+        return base64_match.group(1) if base64_match else None
+
+    def _decode_article_url(self, ugly_url):
+        """Decode the publisher URL embedded in a Google News article token"""
+        encoded_part = self._article_token(ugly_url)
+        return decode_article_token(encoded_part) if encoded_part else None
+
+    def _is_redirect_link(self, url):
+        host = urlparse(self.config["baseURL"]).netloc
+        return bool(url) and (f"{host}/read" in url or f"{host}/rss/articles" in url)
+
     def _get_pretty_url(self, ugly_url):
-        if not ugly_url or "news.google.com/articles" in ugly_url:
-            return ugly_url
+        """Follow a Google News redirect link over the network, returning None on failure"""
+        try:
+            response = self.session.get(
+                ugly_url,
+                allow_redirects=False,
+                timeout=self.config["requestTimeout"],
+            )
+            if response.status_code in (301, 302) and "Location" in response.headers:
+                return response.headers["Location"]
+        except Exception as e:
+            print(f"Error getting redirect URL: {str(e)}")
 
-        if (
-            "news.google.com/read" in ugly_url
-            or "news.google.com/rss/articles" in ugly_url
-        ):
-            try:
-                response = self.session.get(ugly_url, allow_redirects=False)
-                if (
-                    response.status_code in (301, 302)
-                    and "Location" in response.headers
-                ):
-                    return response.headers["Location"]
-
-                # If no redirect, try base64 decoding approach
-                base64_match = re.search(
-                    r"/(?:read|articles)/([A-Za-z0-9-_]+)", ugly_url
+        return None
+
+    def _host_semaphore(self, url):
+        """Return the semaphore capping concurrent requests to the host of `url`"""
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(
+                    max(1, self.config["urlPerHostLimit"])
                 )
-                if base64_match:
-                    encoded_part = base64_match.group(1)
+            return self._host_semaphores[host]
+
+    def _resolve_pretty_url(self, ugly_url):
+        if self.circuit and not self.circuit.allow(urlparse(ugly_url).netloc):
+            return None
+        with self._host_semaphore(ugly_url):
+            return self._get_pretty_url(ugly_url)
+
+    def _resolve_pretty_urls(self, articles):
+        """
+        Replace Google News links with the publisher URLs.
+
+        Each link is first decoded locally from its article token, then looked
+        up in the persistent redirect cache. Only the remaining links hit the
+        network, spread over `urlWorkers` threads with at most `urlPerHostLimit`
+        in-flight requests per host. Articles are updated in place, so result
+        order is preserved.
+        """
+        resolved = {}
+        pending = []
+
+        for article in articles:
+            link = article["link"]
+            if link in resolved or link in pending:
+                continue
+
+            decoded_url = self._decode_article_url(link)
+            if decoded_url:
+                self.redirect_stats["decoded"] += 1
+                resolved[link] = decoded_url
+                continue
+
+            if not self._is_redirect_link(link):
+                continue
+
+            token = self._article_token(link)
+            cached_url = self.redirect_cache.get(token) if self.redirect_cache else None
+            if cached_url:
+                resolved[link] = cached_url
+            else:
+                pending.append(link)
+
+        if pending and self.circuit:
+            self.circuit.load({urlparse(link).netloc for link in pending})
+
+        if pending:
+            workers = max(1, min(self.config["urlWorkers"], len(pending)))
+            print(f"Resolving {len(pending)} pretty URLs with {workers} workers")
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._resolve_pretty_url, link): link
+                    for link in pending
+                }
+                for future in as_completed(futures):
+                    link = futures[future]
+                    try:
+                        pretty_url = future.result()
+                    except Exception as e:
+                        print(f"Error resolving pretty URL: {str(e)}")
+                        pretty_url = None
+
+                    if not pretty_url:
+                        self.redirect_stats["failed"] += 1
+                        continue
+
+                    self.redirect_stats["network"] += 1
+                    resolved[link] = pretty_url
+                    # Cache writes stay on this thread, which owns the site connection
+                    if self.redirect_cache:
+                        self.redirect_cache.set(self._article_token(link), pretty_url)
+
+        if self.circuit:
+            self.circuit.publish()
+
+        if self.redirect_cache:
+            self.redirect_stats.update(self.redirect_cache.stats)
+        print(f"Pretty URL resolution: {self.redirect_stats}")
+
+        for article in articles:
+            if article["link"] in resolved:
+                article["link"] = resolved[article["link"]]
+
+    def _get_content_fetcher(self):
+        """Return the run's article fetcher, whose per-host limits span every batch"""
+        if not self.content_fetcher:
+            self.content_fetcher = ArticleContentFetcher(
+                concurrency=self.config["contentConcurrency"],
+                rate_per_host=self.config["contentRatePerHost"],
+                burst_per_host=self.config["contentBurstPerHost"],
+                max_retries=self.config["contentMaxRetries"],
+                timeout=self.config["contentTimeout"],
+                headers={
+                    "User-Agent": self.session.headers["User-Agent"],
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                    "Accept-Language": self.session.headers["Accept-Language"],
+                },
+                on_response=self.metrics.record_response,
+                circuit=self.circuit,
+            )
+        return self.content_fetcher
+
+    def _get_parser_pool(self):
+        """Return the run's parser pool, so workers are spawned once per run"""
+        if not self.parser_pool:
+            self.parser_pool = ArticleParserPool(
+                workers=self.config["contentWorkers"],
+                max_tasks_per_child=self.config["contentWorkerMaxTasks"],
+                max_memory_mb=self.config["contentWorkerMemoryMB"],
+            )
+        return self.parser_pool
+
+    def _get_articles_content(self, articles):
+        """Download all article pages in parallel and attach their cleaned content"""
+        print(f"Getting content for {len(articles)} articles")
+        if self.circuit:
+            self.circuit.load({urlparse(article["link"]).netloc for article in articles})
+        with self.metrics.stage("content_fetch"):
+            pages = self._get_content_fetcher().fetch_all(article["link"] for article in articles)
+        if self.circuit:
+            self.circuit.publish()
+
+        # Parsing is CPU bound, so it runs in worker processes
+        with self.metrics.stage("content_parse"):
+            contents = self._get_parser_pool().extract_all(
+                ((article["link"], pages.get(article["link"])) for article in articles),
+                self.config.get("filterWords", []),
+            )
+            for article, content_data in zip(articles, contents, strict=True):
+                if content_data:
+                    article["content"] = content_data.get("content", "")
+
+    def _fetch(self, url):
+        """GET a Google News page, going through the conditional-GET cache when enabled"""
+        # Setting cookies for consent
+        cookies = {
+            "CONSENT": f'YES+cb.{time.strftime("%Y%m%d")}-04-p0.en-GB+FX+667',
+        }
+        timeout = self.config["requestTimeout"]
 
-                    # Standard base64 to URL-safe base64
-                    encoded_part = encoded_part.replace("-", "+").replace("_", "/")
+        if self.circuit:
+            # Raises CircuitOpenError while Google is rate limiting or showing captchas
+            self.circuit.load([urlparse(url).netloc])
+            self.circuit.check(url)
 
-                    # Add padding
-                    padding = "=" * (4 - (len(encoded_part) % 4)) % 4
-                    encoded_part += padding
+        try:
+            if self.http_cache:
+                return self.http_cache.get(url, cookies=cookies, timeout=timeout)
 
-                    try:
-                        decoded = base64.b64decode(encoded_part).decode(
-                            "utf-8", errors="ignore"
-                        )
-                        url_match = re.search(r'https?://[^\s"\'<>]+', decoded)
-                        if url_match:
-                            return url_match.group(0)
-                    except:
-                        pass
-            except Exception as e:
-                print(f"Error getting redirect URL: {str(e)}")
+            response = self.session.get(url, cookies=cookies, timeout=timeout)
+            return CachedResponse(url, response.status_code, response.text)
+        finally:
+            if self.circuit:
+                self.circuit.publish()
+
+    def _get_rss_articles(self):
+        """Get article records from the RSS feed"""
+        query_vars = self.config.get("queryVars", {}).copy()
+        query_vars["when"] = self.config["timeframe"]
+
+        if "searchTerm" in self.config:
+            query_vars["q"] = self.config["searchTerm"]
 
-        return ugly_url
+        query_string = self._build_query_string(query_vars)
+        base_url = f"{self.config['baseURL']}/rss/search"
+        url = f"{base_url}{query_string}"
 
-    def _get_article_type(self, article):
-        if article.select("h4") or article.select("div > div + div > div a"):
-            return "regular"
-        if article.select("figure"):
-            return "topicFeatured"
-        if article.select("> a"):
-            return "topicSmall"
-        return ""
+        print(f"Getting articles from RSS: {url}")
 
-    def _get_title(self, article, article_type):
         try:
-            if article_type == "regular":
-                return (
-                    article.select_one("h4").text
-                    if article.select_one("h4")
-                    else (
-                        article.select_one("div > div + div > div a").text
-                        if article.select_one("div > div + div > div a")
-                        else ""
-                    )
-                )
-            if article_type == "topicFeatured" or article_type == "topicSmall":
-                return (
-                    article.select_one('a[target="_blank"]').text
-                    if article.select_one('a[target="_blank"]')
-                    else (
-                        article.select_one("button")["aria-label"].replace(
-                            "More - ", ""
-                        )
-                        if article.select_one("button")
-                        and "aria-label" in article.select_one("button").attrs
-                        else ""
-                    )
-                )
-            return ""
-        except:
-            return ""
+            with self.metrics.stage("rss_fetch"):
+                response = self._fetch(url)
 
-    def _clean_text(self, text):
-        unwanted_keywords = [
-            "subscribe now",
-            "sign up",
-            "newsletter",
-            "exclusive offer",
-            "limited time offer",
-            "free trial",
-            "download now",
-            "join now",
-            "register today",
-            "special promotion",
-            "promotional offer",
-            "discount code",
-            "early access",
-            "sneak peek",
-            "save now",
-            "don't miss out",
-            "act now",
-            "last chance",
-            "expires soon",
-            "giveaway",
-            "free access",
-            "premium access",
-            "unlock full access",
-            "buy now",
-            "learn more",
-            "click here",
-            "follow us on",
-            "share this article",
-            "connect with us",
-            "advertisement",
-            "sponsored content",
-            "partner content",
-            "affiliate links",
-            "for more information",
-            "you may also like",
-            "we think you'll like",
-            "from our network",
-        ] + self.config.get("filterWords", [])
-
-        lines = text.split("\n")
-        cleaned_lines = []
-
-        for line in lines:
-            line = line.strip()
-            if len(line.split()) > 4 and not any(
-                keyword in line.lower() for keyword in unwanted_keywords
-            ):
-                cleaned_lines.append(line)
+            if response.status_code != 200:
+                print(f"Failed to retrieve RSS: {response.status_code}")
+                self.errors.append(f"RSS returned {response.status_code}")
+                return []
 
-        return "\n".join(cleaned_lines)
+            with self.metrics.stage("rss_parse"):
+                rss_articles = self._get_parsed(response, self.parser.parse_rss)
 
-    def _get_article_content(self, article):
-        max_retries = 3
-        retry_delay = 2  # seconds
+            print(f"Extracted {len(rss_articles)} articles from RSS")
+            return rss_articles
 
-        for attempt in range(max_retries):
-            try:
-                url = article["link"]
-                verify_messages = [
-                    "you are human",
-                    "are you human",
-                    "i'm not a robot",
-                    "recaptcha",
-                ]
-
-                # Add random delay to avoid rate limiting
-                time.sleep(retry_delay + random.uniform(1, 3))
-
-                news_article = Article(url)
-                news_article.download()
-                news_article.parse()
-
-                text = news_article.text
-
-                if not text:
-                    print(f"Article content could not be parsed or is empty: {url}")
-                    return {}
-
-                if any(msg in text.lower() for msg in verify_messages):
-                    print(f"Article requires human verification: {url}")
-                    return {}
-
-                cleaned_text = self._clean_text(text)
-
-                if len(cleaned_text.split()) < 100:
-                    print(f"Article content is too short: {url}")
-                    return {}
-
-                print(f"Successfully scraped article content from: {url}")
-
-                return {"content": cleaned_text}
-
-            except requests.exceptions.HTTPError as e:
-                if (
-                    hasattr(e, "response")
-                    and e.response.status_code == 429
-                    and attempt < max_retries - 1
-                ):
-                    wait_time = retry_delay * (
-                        attempt + 2
-                    )  # Increase wait time with each retry
-                    print(
-                        f"Rate limited. Waiting {wait_time}s before retry {attempt+1}/{max_retries}"
-                    )
-                    time.sleep(wait_time)
-                else:
-                    print(f"Error getting article content: {str(e)}")
-                    return {}
-            except Exception as e:
-                print(f"Error getting article content: {str(e)}")
-                return {}
+        except Exception as e:
+            import traceback
+            print(f"Error getting articles from RSS: {str(e)}")
+            self.errors.append(f"RSS error: {str(e)}")
+            print(traceback.format_exc())
+            return []
 
-        return {}
+    def _merge_rss_articles(self, results, rss_articles):
+        """
+        Fill source details on HTML results from the matching RSS items.
+
+        Items are joined on the Google News article token shared by both links,
+        falling back to the normalized title.
+        """
+        by_token = {}
+        by_title = {}
+        for rss_article in rss_articles:
+            token = self._article_token(rss_article["link"])
+            if token:
+                by_token[token] = rss_article
+            by_title[normalize_title(rss_article["title"])] = rss_article
+
+        for article in results:
+            rss_article = by_token.get(self._article_token(article["link"])) or by_title.get(
+                normalize_title(article["title"])
+            )
+            if not rss_article:
+                continue
 
-    def _get_source_info_from_rss(self):
-        """Get source website URLs from RSS feed"""
+            article["source_url"] = rss_article["source_url"]
+            # Use the source name from RSS if available
+            if not article["source"] and rss_article["source"]:
+                article["source"] = rss_article["source"]
+
+    def _get_parsed(self, response, parser):
+        """Run `parser` on the response body, reusing the cached parse of an unchanged body"""
+        if self.http_cache:
+            parsed = self.http_cache.get_parsed(response)
+            if parsed is not None:
+                print(f"Using cached parse for {response.url}")
+                return parsed
+
+        parsed = parser(response.text)
+
+        if self.http_cache:
+            self.http_cache.set_parsed(response, parsed)
+
+        return parsed
+
+    def _scrape_search_page(self):
+        """Get article records, including thumbnails, from the HTML search page"""
+        # Setup query parameters for HTML scraping
         query_vars = self.config.get("queryVars", {}).copy()
         query_vars["when"] = self.config["timeframe"]
 
@@ -250,79 +477,62 @@ class GoogleNewsScraper:
             query_vars["q"] = self.config["searchTerm"]
 
         query_string = self._build_query_string(query_vars)
-        base_url = "https://news.google.com/rss/search"
+        base_url = f"{self.config['baseURL']}/search"
         url = f"{base_url}{query_string}"
 
-        print(f"Getting source info from RSS: {url}")
-
-        try:
-            cookies = {
-                "CONSENT": f'YES+cb.{time.strftime("%Y%m%d")}-04-p0.en-GB+FX+667',
-            }
-
-            response = self.session.get(url, cookies=cookies)
-
-            if response.status_code != 200:
-                print(f"Failed to retrieve RSS: {response.status_code}")
-                return {}
+        print(f"Scraping news from HTML: {url}")
 
-            xml_content = response.text
-            soup = BeautifulSoup(xml_content, "xml")
+        with self.metrics.stage("html_fetch"):
+            response = self._fetch(url)
 
-            items = soup.find_all("item")
-            print(f"Found {len(items)} RSS items for source info")
+        if response.status_code != 200:
+            print(f"Failed to retrieve page: {response.status_code}")
+            self.errors.append(f"Search page returned {response.status_code}")
+            return []
 
-            source_info = {}
+        with self.metrics.stage("html_parse"):
+            return self._get_parsed(response, self.parser.parse_search_page)
+
+    def _drop_seen_articles(self, results):
+        """
+        Drop articles at or behind the high-water mark of the previous run.
+
+        Articles are kept if they are newer than `since` minus `sinceGrace`
+        seconds, which catches late-indexed stories; the overlap is removed
+        later by the content hash check. Processing also stops at the newest
+        link stored by the previous run when the results are in date order.
+        """
+        for article in results:
+            article["link_hash"] = get_link_hash(article["link"])
+
+        if not self.config["since"] and not self.config["seenLinkHash"]:
+            return results
+
+        cutoff = ""
+        if self.config["since"]:
+            since = datetime.strptime(self.config["since"], "%Y-%m-%dT%H:%M:%SZ")
+            cutoff = (since - timedelta(seconds=self.config["sinceGrace"])).strftime(
+                "%Y-%m-%dT%H:%M:%SZ"
+            )
 
-            for item in items:
-                title_elem = item.find("title") 
-                if not title_elem:
-                    continue
+        dated = [article["datetime"] for article in results if article["datetime"]]
+        in_date_order = dated == sorted(dated, reverse=True)
 
-                # Extract the actual article title (not including source)
-                title_text = title_elem.text
-                # Remove source part if it exists (format: "Title - Source")
-                if " - " in title_text:
-                    parts = title_text.split(" - ")
-                    title = " - ".join(parts[:-1])  # Join all parts except the last one (source)
-                else:
-                    title = title_text
-
-                # Extract source from the description field if available
-                description = item.find("description")
-                source_name = ""
-                if description:
-                    # Parse the HTML in description
-                    desc_soup = BeautifulSoup(description.text, "html.parser")
-                    font_elem = desc_soup.find("font", color="#6f6f6f")
-                    if font_elem:
-                        source_name = font_elem.text.strip()
-
-                # Extract source url from the source element
-                source_elem = item.find("source")
-                source_url = ""
-                if source_elem and "url" in source_elem.attrs:
-                    source_url = source_elem["url"]
-                    # If no source name was found in description, use the source element text
-                    if not source_name and source_elem.text:
-                        source_name = source_elem.text
-
-                if title and (source_name or source_url):
-                    source_info[title] = {
-                        "source_name": source_name,
-                        "source_url": source_url
-                    }
-
-            print(f"Extracted {len(source_info)} source URLs from RSS")
-            return source_info
+        new_results = []
+        for article in results:
+            if article["link_hash"] == self.config["seenLinkHash"]:
+                if in_date_order:
+                    break
+                continue
+            if cutoff and article["datetime"] and article["datetime"] < cutoff:
+                continue
+            new_results.append(article)
 
-        except Exception as e:
-            import traceback
-            print(f"Error getting source info from RSS: {str(e)}")
-            print(traceback.format_exc())
-            return {}
+        print(f"{len(new_results)} of {len(results)} articles are newer than the last run")
+        return new_results
 
-    def scrape(self):
+    def _get_result_list(self):
+        """Return the article records to process, before URL resolution and content"""
         # Check if the search term is in Arabic to add proper language/region parameters
         if self.config.get("searchTerm") and any('\u0600' <= c <= '\u06FF' for c in self.config["searchTerm"]):
             # Arabic character range check
@@ -333,338 +543,580 @@ class GoogleNewsScraper:
             query_vars["gl"] = "AE"  # UAE region code
             query_vars["ceid"] = "AE:ar"  # Country edition ID
             self.config["queryVars"] = query_vars
-        
-        # Get source website URLs from RSS if enabled
-        source_info = {}
+
+        # Get article records from RSS if enabled
+        rss_articles = []
         if self.config["useRSS"]:
-            source_info = self._get_source_info_from_rss()
-        
-        # Setup query parameters for HTML scraping
-        query_vars = self.config.get("queryVars", {}).copy()
-        query_vars["when"] = self.config["timeframe"]
-        
-        if "searchTerm" in self.config:
-            query_vars["q"] = self.config["searchTerm"]
-        
-        query_string = self._build_query_string(query_vars)
-        base_url = "https://news.google.com/search"
-        url = f"{base_url}{query_string}"
-        
-        print(f"Scraping news from HTML: {url}")
+            rss_articles = self._get_rss_articles()
 
+        # The feed has everything except thumbnails, so only fetch the
+        # search page when images are wanted
+        if rss_articles and (
+            not self.config["requireImages"]
+            or all(article["image"] for article in rss_articles)
+        ):
+            print("Using RSS articles, skipping the HTML search page")
+            results = rss_articles
+        else:
+            results = self._scrape_search_page()
+            self._merge_rss_articles(results, rss_articles)
+
+        # Skip everything already ingested by previous runs
+        self.metrics.increment("articles_scraped", len(results))
+        results = self._drop_seen_articles(results)
+
+        # Apply limit before processing URLs and content
+        if self.config["limit"] < len(results):
+            print(f"Limiting results to {self.config['limit']} articles")
+            results = results[: self.config["limit"]]
+
+        return results
+
+    def iter_scrape(self):
+        """
+        Yield fully processed articles in batches of `streamBatchSize`.
+
+        The result list comes from a single RSS / search page request; URL
+        resolution and content download then run batch by batch. Batches are
+        produced on demand as the caller iterates, so a caller storing each
+        batch commits progress early and only one batch of article bodies is
+        held in memory; fetching and storing do not overlap. The content
+        fetcher and parser pool are shared by every batch of the run. A
+        failing batch is recorded in `errors` and skipped.
+        """
         try:
-            # Setting cookies for consent
-            cookies = {
-                "CONSENT": f'YES+cb.{time.strftime("%Y%m%d")}-04-p0.en-GB+FX+667',
-            }
+            results = self._get_result_list()
+        except Exception as e:
+            import traceback
 
-            response = self.session.get(url, cookies=cookies)
+            print(f"Error during scraping: {str(e)}")
+            self.errors.append(f"Scrape error: {str(e)}")
+            print(traceback.format_exc())
+            self._record_cache_stats()
+            return
 
-            if response.status_code != 200:
-                print(f"Failed to retrieve page: {response.status_code}")
-                return []
+        batch_size = max(1, self.config["streamBatchSize"])
+
+        try:
+            while results:
+                batch, results = results[:batch_size], results[batch_size:]
 
-            html_content = response.text
-            soup = BeautifulSoup(html_content, "html.parser")
+                try:
+                    # Process URLs if needed
+                    if self.config["prettyURLs"]:
+                        with self.metrics.stage("redirects"):
+                            self._resolve_pretty_urls(batch)
 
-            articles_elements = soup.select("article")
-            print(f"Found {len(articles_elements)} article elements")
+                    # Get article content if needed
+                    if self.config["getArticleContent"]:
+                        self._get_articles_content(batch)
 
-            results = []
+                except Exception as e:
+                    import traceback
 
-            for article_elem in articles_elements:
-                # Extract link
-                link_elem = article_elem.select_one(
-                    'a[href^="./article"]'
-                ) or article_elem.select_one('a[href^="./read"]')
-                if not link_elem:
+                    print(f"Error during scraping: {str(e)}")
+                    self.errors.append(f"Scrape error: {str(e)}")
+                    print(traceback.format_exc())
                     continue
 
-                link = link_elem["href"].replace("./", "https://news.google.com/")
+                batch = [result for result in batch if result.get("title")]
+                if batch:
+                    yield batch
 
-                # Extract image
-                img_elem = article_elem.select_one("figure img")
-                image = ""
-                if img_elem:
-                    if "srcset" in img_elem.attrs:
-                        srcset = img_elem["srcset"].split()
-                        if len(srcset) >= 2:
-                            image = srcset[-2]
-                    elif "src" in img_elem.attrs:
-                        image = img_elem["src"]
+        finally:
+            if self.parser_pool:
+                self.parser_pool.close()
+                self.parser_pool = None
+            self._record_cache_stats()
 
-                if image and image.startswith("/"):
-                    image = f"https://news.google.com{image}"
+    def scrape(self):
+        """Return every processed article at once"""
+        return [article for batch in self.iter_scrape() for article in batch]
+
+
+NEWS_SCRAPE_QUEUE_KEY = "crm:news_scrape_pending"
+NEWS_SCRAPE_DISPATCH_KEY = "crm:news_scrape_dispatch"
+NEWS_SCRAPE_CONFIG_FIELDS = [
+    "name",
+    "search_term",
+    "limit",
+    "category",
+    "fetch_images",
+    "get_article_content",
+    "timeframe",
+    "last_successful_run",
+    "last_published_date",
+    "last_link_hash",
+]
+
+
+def _get_scraper_settings():
+    settings = frappe.get_cached_doc("News Scraper Settings")
+    return frappe._dict(
+        max_parallel_jobs=max(1, settings.max_parallel_jobs or 1),
+        job_timeout=settings.job_timeout or 3600,
+        http_cache_freshness=settings.http_cache_freshness or 0,
+    )
 
-                # Get article type and title
-                article_type = self._get_article_type(article_elem)
-                title = self._get_title(article_elem, article_type)
 
-                if not title:
-                    continue
+def get_incremental_timeframe(last_run, timeframe):
+    """
+    Shrink the Google News `when` window to the time since the last successful run.
 
-                # Get source and time
-                source_elem = article_elem.select_one("div[data-n-tid]")
-                source = source_elem.text if source_elem else ""
-
-                # Extract favicon directly from Google's results
-                favicon = ""
-                favicon_elem = article_elem.select_one("img.qEdqNd")
-                if favicon_elem:
-                    if "src" in favicon_elem.attrs:
-                        favicon = favicon_elem["src"]
-                    elif "srcset" in favicon_elem.attrs:
-                        srcset = favicon_elem["srcset"].split()
-                        if srcset:
-                            favicon = srcset[0]
-
-                time_elem = article_elem.select_one("div:last-child time")
-                time_text = time_elem.text if time_elem else ""
-                datetime_attr = (
-                    time_elem["datetime"]
-                    if time_elem and "datetime" in time_elem.attrs
-                    else ""
-                )
+    The window is rounded up to whole hours plus one hour of overlap and never
+    exceeds the configured `timeframe`.
+    """
+    match = re.fullmatch(r"(\d+)([hdm])", timeframe or "")
+    if not last_run or not match:
+        return timeframe
+
+    max_hours = int(match.group(1)) * {"h": 1, "d": 24, "m": 24 * 30}[match.group(2)]
+    elapsed = frappe.utils.now_datetime() - frappe.utils.get_datetime(last_run)
+    hours = int(elapsed.total_seconds() // 3600) + 2
+
+    if hours >= max_hours:
+        return timeframe
+    if hours > 48:
+        return f"{-(-hours // 24)}d"
+    return f"{hours}h"
+
+
+def update_high_water_mark(config, articles):
+    """Record the newest article seen and the time of this successful run"""
+    values = {"last_successful_run": frappe.utils.now_datetime()}
+
+    dated = [article for article in articles if article["datetime"]]
+    if dated:
+        newest = max(dated, key=lambda article: article["datetime"])
+        newest_date = datetime.strptime(newest["datetime"], "%Y-%m-%dT%H:%M:%SZ")
+        if not config.last_published_date or newest_date > frappe.utils.get_datetime(
+            config.last_published_date
+        ):
+            values["last_published_date"] = newest_date
+            values["last_link_hash"] = newest["link_hash"]
 
-                # Add source website URL from RSS data if available
-                source_url = ""
-                if title in source_info:
-                    source_url = source_info[title]["source_url"]
-                    # Use the source name from RSS if available
-                    if not source and "source_name" in source_info[title]:
-                        source = source_info[title]["source_name"]
-
-                article_data = {
-                    "title": title,
-                    "link": link,
-                    "image": image,
-                    "source": source,
-                    "source_url": source_url,
-                    "favicon": favicon,
-                    "datetime": datetime_attr,
-                    "time": time_text,
-                    "articleType": article_type,
-                }
+    frappe.db.set_value("News Search Config", config.name, values, update_modified=False)
 
-                results.append(article_data)
-
-            # Apply limit before processing URLs and content
-            if self.config["limit"] < len(results):
-                print(f"Limiting results to {self.config['limit']} articles")
-                results = results[: self.config["limit"]]
-
-            # Process URLs if needed
-            if self.config["prettyURLs"]:
-                for i, article in enumerate(results):
-                    print(f"Getting pretty URL for article {i+1}/{len(results)}")
-                    pretty_url = self._get_pretty_url(article["link"])
-                    if pretty_url:
-                        article["link"] = pretty_url
-
-            # Get article content if needed
-            if self.config["getArticleContent"]:
-                for i, article in enumerate(results):
-                    print(f"Getting content for article {i+1}/{len(results)}")
-                    content_data = self._get_article_content(article)
-                    if content_data:
-                        article["content"] = content_data.get("content", "")
-
-            # Filter and return results
-            filtered_results = [result for result in results if result.get("title")]
-            return filtered_results
 
-        except Exception as e:
-            import traceback
+def _get_job_id(config_name):
+    return f"news_scrape::{config_name}"
 
-            print(f"Error during scraping: {str(e)}")
-            print(traceback.format_exc())
-            return []
+
+def _enqueue_config_job(config_name, job_timeout):
+    """Enqueue the scrape job for one config, skipping it if it is already queued or running"""
+    job_id = _get_job_id(config_name)
+    if is_job_enqueued(job_id):
+        print(f"Scrape job for {config_name} is already queued or running")
+        return False
+
+    frappe.enqueue(
+        "crm.news_scraper.scrape_news_for_config",
+        queue="long",
+        timeout=job_timeout,
+        job_id=job_id,
+        deduplicate=True,
+        config_name=config_name,
+        dispatch_id=frappe.cache.get_value(NEWS_SCRAPE_DISPATCH_KEY),
+    )
+    return True
+
+
+def _enqueue_next_config():
+    """Start the next pending config, keeping at most `max_parallel_jobs` running"""
+    settings = _get_scraper_settings()
+
+    while True:
+        config_name = frappe.cache.lpop(NEWS_SCRAPE_QUEUE_KEY)
+        if not config_name:
+            return
+
+        if isinstance(config_name, bytes):
+            config_name = config_name.decode()
+
+        if _enqueue_config_job(config_name, settings.job_timeout):
+            return
 
 
 # Function to use in Frappe's scheduler
 def scrape_and_store_news():
     """
     Function to be called by Frappe scheduler to scrape and store news
-    for multiple search configurations
+    for multiple search configurations.
+
+    Each enabled config is scraped in its own background job on the long queue.
+    Only `max_parallel_jobs` jobs are started here; every finished job starts
+    the next pending config, so the whole run is spread across the workers.
     """
     print("Starting news scraping...")
 
     # Get all active news search configurations
-    search_configs = frappe.get_all(
+    config_names = frappe.get_all(
         "News Search Config",
         filters={"enabled": 1},
-        fields=[
-            "name",
-            "search_term",
-            "limit",
-            "category",
-        ],
+        pluck="name",
     )
 
-    print(f"Found {len(search_configs)} active search configurations")
+    print(f"Found {len(config_names)} active search configurations")
 
-    if not search_configs:
+    if not config_names:
         print("No active news search configurations found")
         return
 
-    for config in search_configs:
+    settings = _get_scraper_settings()
+
+    # Every News Scrape Run of this dispatch shares the same ID
+    frappe.cache.set_value(NEWS_SCRAPE_DISPATCH_KEY, frappe.generate_hash(length=10))
+    frappe.cache.delete_value(NEWS_SCRAPE_QUEUE_KEY)
+    for config_name in config_names:
+        frappe.cache.rpush(NEWS_SCRAPE_QUEUE_KEY, config_name)
+
+    for _ in range(min(settings.max_parallel_jobs, len(config_names))):
+        _enqueue_next_config()
+
+    print("News scraping jobs dispatched")
+
+
+def top_up_news_scrape_jobs():
+    """
+    Cron job restarting a broken dispatch chain.
+
+    Every finished job starts the next pending config, so a job that dies
+    before its `finally` (a killed worker, a hard timeout) would strand the
+    rest of the queue. This starts pending configs until `max_parallel_jobs`
+    are queued or running again.
+    """
+    if not frappe.cache.llen(NEWS_SCRAPE_QUEUE_KEY):
+        return
+
+    settings = _get_scraper_settings()
+    active = sum(
+        is_job_enqueued(_get_job_id(config_name))
+        for config_name in frappe.get_all("News Search Config", filters={"enabled": 1}, pluck="name")
+    )
+
+    for _ in range(settings.max_parallel_jobs - active):
+        _enqueue_next_config()
+
+
+def scrape_news_for_config(config_name, dispatch_id=None):
+    """
+    Background job scraping and storing news for a single search config.
+
+    The run is logged as a News Scrape Run with its stage timings, request
+    counts and errors, whether it succeeds or not.
+    """
+    try:
+        config = frappe.db.get_value(
+            "News Search Config",
+            config_name,
+            NEWS_SCRAPE_CONFIG_FIELDS,
+            as_dict=True,
+        )
+
+        if not config:
+            print(f"News search config {config_name} no longer exists")
+            return
+
+        run = start_scrape_run(config, dispatch_id)
+        metrics = ScrapeMetrics()
         try:
-            print(f"Processing news for search term: {config.search_term}")
-
-            scraper_config = {
-                "searchTerm": config.search_term,
-                "prettyURLs": config.get_article_content == 1,
-                "getArticleContent": config.get_article_content == 1,
-                "useRSS": True,
-                "timeframe": config.timeframe or "7d",
-                "limit": config.limit or 10,
-            }
+            scrape_and_store_config(config, metrics=metrics)
+        except Exception:
+            frappe.db.rollback()
+            metrics.errors.append(frappe.get_traceback())
+            run.finish("Failed", metrics)
+            frappe.db.commit()
+            raise
+
+        run.finish("Partial" if metrics.errors else "Success", metrics)
+        frappe.db.commit()
+    finally:
+        _enqueue_next_config()
+
+
+class NewsSourceResolver:
+    """
+    Map publisher names to News Source documents for one scrape run.
+
+    All existing sources are loaded with a single query. Unknown publishers are
+    collected with `add` and created together by `create_missing`.
+    """
+
+    def __init__(self):
+        self.sources = {
+            source.source_name: source.name
+            for source in frappe.get_all("News Source", fields=["name", "source_name"])
+        }
+        self.missing = {}
+        self.favicons = {}
+
+    def add(self, source_name, source_url="", favicon=""):
+        if source_name and source_name not in self.sources:
+            self.missing.setdefault(source_name, source_url)
+            if favicon:
+                self.favicons.setdefault(source_name, favicon)
+
+    def resolve(self, source_name):
+        return self.sources.get(source_name)
+
+    def create_missing(self):
+        """Bulk insert all collected sources and return their names"""
+        if not self.missing:
+            return []
+
+        now = frappe.utils.now()
+        user = frappe.session.user
+        values = []
+        for source_name, source_url in self.missing.items():
+            if source_url and not source_url.startswith("http"):
+                source_url = "https://" + source_url
+            values.append((source_name, now, now, user, user, source_name, source_url))
+
+        frappe.db.bulk_insert(
+            "News Source",
+            fields=["name", "creation", "modified", "owner", "modified_by", "source_name", "website_url"],
+            values=values,
+            ignore_duplicates=True,
+        )
+        frappe.db.commit()
+
+        created = list(self.missing)
+        self.sources.update({source_name: source_name for source_name in created})
+        print(f"Created {len(created)} new news sources")
+
+        # Bulk insert skips after_insert, so fetch the favicons separately,
+        # starting from the favicon URLs the scraper already found
+        frappe.enqueue(
+            "crm.crm.doctype.news_source.news_source.fetch_favicons",
+            queue="short",
+            source_names=created,
+            favicon_urls={name: self.favicons[name] for name in created if name in self.favicons},
+        )
+        self.missing = {}
+        self.favicons = {}
+
+        return created
 
-            print(f"Starting scraper with config: {scraper_config}")
-            scraper = GoogleNewsScraper(scraper_config)
-            news_articles = scraper.scrape()
 
-            print(
-                f"Found {len(news_articles)} articles for search term: {config.search_term}"
+def filter_new_articles(articles):
+    """
+    Drop articles that are already stored or repeated within the batch.
+
+    Articles are keyed by their content hash, so the whole batch is checked with
+    a single indexed `IN` query.
+    """
+    for article in articles:
+        article["content_hash"] = get_content_hash(article["link"], article["title"])
+
+    hashes = list({article["content_hash"] for article in articles})
+    existing = set()
+    if hashes:
+        existing = set(
+            frappe.get_all(
+                "News",
+                filters={"content_hash": ["in", hashes]},
+                pluck="content_hash",
             )
+        )
 
-            # Store in Frappe DocType
-            articles_added = 0
-            for article in news_articles:
-                # Check if article already exists
-                existing = frappe.get_all(
-                    "News",
-                    filters={"title": article["title"]},
-                    fields=["name"],
-                )
+    new_articles = []
+    for article in articles:
+        if article["content_hash"] in existing:
+            continue
+        existing.add(article["content_hash"])
+        new_articles.append(article)
+
+    return new_articles
 
-                if not existing:
-                    # Get or create News Source
-                    source_name = article["source"]
-                    source_url = article.get("source_url", "")
-
-                    # Check if source exists
-                    existing_source = frappe.get_all(
-                        "News Source",
-                        filters={"source_name": source_name},
-                        fields=["name"],
-                    )
-
-                    if existing_source:
-                        source_doc_name = existing_source[0].name
-                    else:
-                        # Create new source
-                        source_doc = frappe.new_doc("News Source")
-                        source_doc.source_name = source_name
-                        source_doc.website_url = source_url
-                        source_doc.insert(ignore_permissions=True)
-                        source_doc_name = source_doc.name
-
-                    # Create the news item
-                    doc = frappe.new_doc("News")
-                    doc.title = article["title"]
-                    doc.link = article["link"]
-                    # We'll handle the image separately
-                    doc.source = source_doc_name  # Link field to News Source
-
-                    # Parse and format the datetime properly
-                    if article["datetime"]:
-                        try:
-                            # Convert ISO format to MySQL datetime
-                            from datetime import datetime
-
-                            parsed_date = datetime.strptime(
-                                article["datetime"], "%Y-%m-%dT%H:%M:%SZ"
-                            )
-                            doc.published_date = parsed_date.strftime(
-                                "%Y-%m-%d %H:%M:%S"
-                            )
-                        except Exception as e:
-                            print(
-                                f"Error parsing date: {article['datetime']} - {str(e)}"
-                            )
-                            doc.published_date = None
-                    else:
-                        doc.published_date = None
-
-                    doc.article_type = article["articleType"]
-                    doc.category = config.category
-
-                    if "content" in article and article["content"]:
-                        doc.content = article["content"]
-
-                    # First insert the document
+
+class NewsBatchStore:
+    """
+    Store the articles of one search config batch by batch.
+
+    Each `store` call de-duplicates, clusters and inserts one batch and
+    commits it, so articles become visible while later batches are still
+    being scraped and a failure only loses the batch in flight. Sources,
+    stored images and the story index are shared across batches.
+    """
+
+    def __init__(self, config, metrics):
+        self.config = config
+        self.metrics = metrics
+        self.story_index = StoryClusterIndex()
+        self.source_resolver = NewsSourceResolver()
+        self.image_ingestor = NewsImageIngestor(on_response=metrics.record_response)
+        self.articles_seen = 0
+        self.articles_added = 0
+        self.newest = None
+
+    def _track_newest(self, articles):
+        for article in articles:
+            if article["datetime"] and (
+                not self.newest or article["datetime"] > self.newest["datetime"]
+            ):
+                self.newest = {"datetime": article["datetime"], "link_hash": article["link_hash"]}
+
+    def _build_doc(self, article, image):
+        # Create the news item
+        doc = frappe.new_doc("News")
+        doc.title = article["title"]
+        doc.link = article["link"]
+        doc.content_hash = article["content_hash"]
+        doc.source = self.source_resolver.resolve(article["source"])  # Link field to News Source
+
+        self.story_index.prepare(article)
+        doc.story_cluster = article["story_cluster"]
+        doc.is_near_duplicate = article["is_near_duplicate"]
+
+        # Parse and format the datetime properly
+        if article["datetime"]:
+            try:
+                # Convert ISO format to MySQL datetime
+                parsed_date = datetime.strptime(article["datetime"], "%Y-%m-%dT%H:%M:%SZ")
+                doc.published_date = parsed_date.strftime("%Y-%m-%d %H:%M:%S")
+            except Exception as e:
+                print(f"Error parsing date: {article['datetime']} - {str(e)}")
+                doc.published_date = None
+        else:
+            doc.published_date = None
+
+        doc.article_type = article["articleType"]
+        doc.search_config = self.config.name
+        doc.category = self.config.category
+
+        if "content" in article and article["content"]:
+            doc.content = article["content"]
+
+        doc.image = image
+        return doc
+
+    def store(self, articles):
+        """Insert the new articles of one batch, commit, and return how many were added"""
+        metrics = self.metrics
+        self.articles_seen += len(articles)
+        self._track_newest(articles)
+
+        with metrics.stage("dedupe"):
+            new_articles = filter_new_articles(articles)
+        metrics.increment("articles_seen", len(articles))
+        metrics.increment("articles_deduplicated", len(articles) - len(new_articles))
+        print(f"{len(new_articles)} of {len(articles)} articles in batch are new")
+
+        if not new_articles:
+            return 0
+
+        # Group syndicated copies of the same story, across configs and runs
+        with metrics.stage("clustering"):
+            self.story_index.assign(new_articles)
+
+        # Create every unseen publisher in one go before inserting the articles
+        with metrics.stage("sources"):
+            for article in new_articles:
+                self.source_resolver.add(
+                    article["source"], article.get("source_url", ""), article.get("favicon", "")
+                )
+            self.source_resolver.create_missing()
+
+        with metrics.stage("images"):
+            images = self.image_ingestor.ingest(article["image"] for article in new_articles)
+
+        with metrics.stage("db_writes"):
+            added = 0
+            news_with_images = []
+            for article in new_articles:
+                # Insert the document together with its image
+                doc = self._build_doc(article, images.get(article["image"]))
+                try:
                     doc.insert(ignore_permissions=True)
+                except (frappe.DuplicateEntryError, frappe.UniqueValidationError):
+                    # Same headline under a different link, or the same article
+                    # stored meanwhile by a parallel config job (unique content_hash)
+                    print(f"Skipping duplicate article: {article['title']}")
+                    metrics.increment("articles_deduplicated")
+                    continue
 
-                    # Then download and attach the image if available
-                    if article["image"]:
-                        try:
-                            # Download the image
-                            image_url = article["image"]
-                            session = requests.Session()
-
-                            # Set headers to mimic a browser
-                            headers = {
-                                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                                "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
-                                "Accept-Language": "en-US,en;q=0.5",
-                                "Referer": "https://news.google.com/",
-                            }
-
-                            response = session.get(
-                                image_url, headers=headers, allow_redirects=True
-                            )
-
-                            if response.status_code == 200:
-                                # Generate a filename based on article title
-                                import re
-
-                                safe_title = (
-                                    re.sub(r"[^\w\s-]", "", article["title"])
-                                    .strip()
-                                    .replace(" ", "_")
-                                )
-                                file_name = (
-                                    f"{safe_title[:50]}.jpg"  # Limit filename length
-                                )
-
-                                # Attach file to document
-                                from frappe.utils.file_manager import save_file
-
-                                file_doc = save_file(
-                                    file_name,
-                                    response.content,
-                                    "News",
-                                    doc.name,
-                                    is_private=0,
-                                )
-
-                                # Update the image field with the attached file URL
-                                if file_doc:
-                                    doc.image = file_doc.file_url
-                                    doc.save()  # Save the document with the updated image field
-
-                        except Exception as e:
-                            import traceback
-
-                            print(
-                                f"Error downloading image for article {doc.name}: {str(e)}"
-                            )
-                            print(traceback.format_exc())
-                            # Continue processing even if image download fails
-
-                    articles_added += 1
+                self.story_index.add(article)
+                added += 1
+                if doc.image:
+                    news_with_images.append(doc.name)
+                if article["is_near_duplicate"]:
+                    metrics.increment("articles_near_duplicate")
+
+            self.story_index.flush()
+
+            # Resized variants are encoded in the background, off the scrape
+            if news_with_images:
+                frappe.enqueue(
+                    "crm.news_images.optimize_news_images",
+                    queue="long",
+                    enqueue_after_commit=True,
+                    news_names=news_with_images,
+                )
 
             frappe.db.commit()
-            print(
-                f"Added {articles_added} new articles for search term: {config.search_term}"
-            )
 
-        except Exception as e:
-            import traceback
+        metrics.increment("articles_added", added)
+        self.articles_added += added
+        return added
 
-            print(f"Error scraping news for {config.search_term}: {str(e)}")
-            print(traceback.format_exc())
-            # Continue with next config instead of breaking
 
-    print("News scraping completed")
+def scrape_and_store_config(config, scraper_overrides=None, metrics=None):
+    """
+    Scrape news for one search config and store the new articles.
+
+    Articles are stored in committed batches as the scraper yields them.
+    `scraper_overrides` is merged into the scraper config last, e.g. to point
+    the scraper at a local stand-in server. Stage timings and counters are
+    collected in `metrics` when given.
+    """
+    try:
+        print(f"Processing news for search term: {config.search_term}")
+
+        scraper_config = {
+            "searchTerm": config.search_term,
+            "prettyURLs": config.get_article_content == 1,
+            "getArticleContent": config.get_article_content == 1,
+            "useRSS": True,
+            "requireImages": config.fetch_images == 1,
+            "timeframe": get_incremental_timeframe(
+                config.last_successful_run, config.timeframe or "7d"
+            ),
+            "limit": config.limit or 10,
+            "cacheFreshness": _get_scraper_settings().http_cache_freshness,
+            "since": (
+                frappe.utils.get_datetime(config.last_published_date).strftime("%Y-%m-%dT%H:%M:%SZ")
+                if config.last_published_date
+                else None
+            ),
+            "seenLinkHash": config.last_link_hash,
+        }
+        scraper_config.update(scraper_overrides or {})
+
+        print(f"Starting scraper with config: {scraper_config}")
+        metrics = metrics or ScrapeMetrics()
+        scraper = GoogleNewsScraper(scraper_config, metrics)
+        store = NewsBatchStore(config, metrics)
+
+        for batch in scraper.iter_scrape():
+            store.store(batch)
+
+        print(
+            f"Found {store.articles_seen} articles for search term: {config.search_term}"
+        )
+
+        # Only move the high-water mark forward when the whole scrape succeeded
+        if not scraper.errors:
+            update_high_water_mark(config, [store.newest] if store.newest else [])
+            frappe.db.commit()
+
+        print(
+            f"Added {store.articles_added} new articles for search term: {config.search_term}"
+        )
+        return store.articles_added
+
+    except Exception as e:
+        import traceback
+
+        print(f"Error scraping news for {config.search_term}: {str(e)}")
+        print(traceback.format_exc())
+        raise
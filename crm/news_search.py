@@ -0,0 +1,102 @@
+import re
+import unicodedata
+
+import frappe
+from pypika.terms import LiteralValue
+
+# Harakat, superscript alef and Quranic annotation marks carry no meaning for search
+ARABIC_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]")
+ARABIC_LETTER_MAP = str.maketrans(
+    {
+        # Hamza and madda forms of alef
+        "\u0623": "\u0627",
+        "\u0625": "\u0627",
+        "\u0622": "\u0627",
+        "\u0671": "\u0627",
+        # Alef maqsura, taa marbuta and hamza seats
+        "\u0649": "\u064a",
+        "\u0629": "\u0647",
+        "\u0624": "\u0648",
+        "\u0626": "\u064a",
+        # Tatweel
+        "\u0640": None,
+    }
+)
+# The definite article, optionally behind a conjunction or preposition
+ARABIC_ARTICLE = re.compile("^[\u0648\u0641]?(?:[\u0628\u0643]?\u0627\u0644|\u0644\u0644)(?=\\w{2})")
+
+# InnoDB ignores shorter words in FULLTEXT searches (innodb_ft_min_token_size)
+MIN_TOKEN_LENGTH = 3
+MAX_INDEXED_CHARS = 20000
+MAX_QUERY_TOKENS = 8
+
+
+def normalize_search_token(token):
+    return ARABIC_ARTICLE.sub("", token)
+
+
+def normalize_search_text(text):
+    """Case-fold text, unify Arabic letter variants and drop diacritics and the definite article"""
+    if not text:
+        return ""
+
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = ARABIC_DIACRITICS.sub("", text).translate(ARABIC_LETTER_MAP)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(normalize_search_token(token) for token in text.split())
+
+
+def build_search_text(title, content=None):
+    """Return the indexed text of an article; the title is repeated so title matches rank higher"""
+    title = normalize_search_text(title)
+    content = normalize_search_text((content or "")[:MAX_INDEXED_CHARS])
+    return " ".join(filter(None, (title, title, content)))
+
+
+def get_search_tokens(search_term):
+    tokens = [token for token in normalize_search_text(search_term).split() if len(token) >= MIN_TOKEN_LENGTH]
+    return list(dict.fromkeys(tokens))[:MAX_QUERY_TOKENS]
+
+
+def supports_fulltext():
+    return frappe.db.db_type == "mariadb"
+
+
+class NewsSearch:
+    """
+    Search condition and relevance score for a `search_term` on News.
+
+    On MariaDB this is a boolean-mode MATCH against the FULLTEXT index on
+    `search_text`: every token must match, as a prefix, and rows are ranked by
+    the index's relevance. Elsewhere every token must appear in `search_text`
+    and rows keep their date order. Tokens are normalized the same way as the
+    indexed text, so Arabic spelling variants still match.
+    """
+
+    def __init__(self, News, search_term):
+        self.tokens = get_search_tokens(search_term)
+        self.fulltext = supports_fulltext()
+        self.condition = None
+        self.score = None
+
+        if not self.tokens:
+            # Too short to be indexed; fall back to a plain substring match
+            term = normalize_search_text(search_term)
+            self.condition = News.search_text.like(f"%{term}%")
+        elif self.fulltext:
+            against = frappe.db.escape(" ".join(f"+{token}*" for token in self.tokens))
+            self.score = LiteralValue(f"MATCH(`tabNews`.`search_text`) AGAINST ({against} IN BOOLEAN MODE)")
+            self.condition = self.score > 0
+        else:
+            for token in self.tokens:
+                condition = News.search_text.like(f"%{token}%")
+                self.condition = condition if self.condition is None else self.condition & condition
+
+
+def add_fulltext_index():
+    """Add the FULLTEXT index on News.search_text if the database supports it"""
+    if not supports_fulltext():
+        return
+
+    if not frappe.db.sql("show index from `tabNews` where Key_name = 'search_text'"):
+        frappe.db.sql_ddl("alter table `tabNews` add fulltext index `search_text` (`search_text`)")
@@ -0,0 +1,46 @@
+import frappe
+
+from crm.crm.doctype.news.news import get_content_hash
+
+BATCH_SIZE = 1000
+
+
+def execute():
+    """Compute content_hash for News rows created before the column existed"""
+    seen_hashes = set(
+        frappe.get_all(
+            "News", filters={"content_hash": ["is", "set"]}, pluck="content_hash"
+        )
+    )
+    updated = 0
+    duplicates = 0
+    last_name = ""
+
+    while True:
+        rows = frappe.get_all(
+            "News",
+            filters={"content_hash": ["is", "not set"], "name": [">", last_name]},
+            fields=["name", "link", "title"],
+            order_by="name asc",
+            limit=BATCH_SIZE,
+        )
+        if not rows:
+            break
+
+        for row in rows:
+            content_hash = get_content_hash(row.link, row.title)
+            if content_hash in seen_hashes:
+                # Leave duplicates unset so the unique index is not violated
+                duplicates += 1
+                continue
+
+            seen_hashes.add(content_hash)
+            frappe.db.set_value(
+                "News", row.name, "content_hash", content_hash, update_modified=False
+            )
+            updated += 1
+
+        last_name = rows[-1].name
+        frappe.db.commit()
+
+    print(f"Backfilled content hash for {updated} news articles ({duplicates} duplicates skipped)")
@@ -0,0 +1,37 @@
+import frappe
+
+from crm.news_search import build_search_text
+
+BATCH_SIZE = 1000
+
+
+def execute():
+    """Fill search_text for News rows created before the full-text index existed"""
+    updated = 0
+    last_name = ""
+
+    while True:
+        rows = frappe.get_all(
+            "News",
+            filters={"search_text": ["is", "not set"], "name": [">", last_name]},
+            fields=["name", "title", "content"],
+            order_by="name asc",
+            limit=BATCH_SIZE,
+        )
+        if not rows:
+            break
+
+        for row in rows:
+            frappe.db.set_value(
+                "News",
+                row.name,
+                "search_text",
+                build_search_text(row.title, row.content),
+                update_modified=False,
+            )
+            updated += 1
+
+        last_name = rows[-1].name
+        frappe.db.commit()
+
+    print(f"Built search text for {updated} news articles")
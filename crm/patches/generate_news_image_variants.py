@@ -0,0 +1,22 @@
+import frappe
+
+BATCH_SIZE = 200
+
+
+def execute():
+    """Queue WebP variant generation for News stored before variants existed"""
+    news_names = frappe.get_all(
+        "News",
+        filters={"image": ["is", "set"], "image_variants": ["is", "not set"]},
+        pluck="name",
+        order_by="name asc",
+    )
+
+    for start in range(0, len(news_names), BATCH_SIZE):
+        frappe.enqueue(
+            "crm.news_images.optimize_news_images",
+            queue="long",
+            news_names=news_names[start : start + BATCH_SIZE],
+        )
+
+    print(f"Queued image variants for {len(news_names)} news articles")
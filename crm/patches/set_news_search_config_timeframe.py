@@ -0,0 +1,12 @@
+import frappe
+
+
+def execute():
+    """Give existing News Search Configs the timeframe the scraper used to hard-code"""
+    frappe.db.set_value(
+        "News Search Config",
+        {"timeframe": ["is", "not set"]},
+        "timeframe",
+        "7d",
+        update_modified=False,
+    )
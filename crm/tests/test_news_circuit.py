@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from frappe.tests import UnitTestCase
+
+from crm import news_circuit
+from crm.news_circuit import HostCircuitBreaker, is_captcha_page
+
+
+class UnitTestHostCircuitBreaker(UnitTestCase):
+	def setUp(self):
+		self.now = 1000.0
+		for patcher in (
+			patch.object(news_circuit, "time", SimpleNamespace(time=lambda: self.now)),
+			# Take the upper end of every jittered delay
+			patch.object(news_circuit, "random", SimpleNamespace(uniform=lambda low, high: high)),
+		):
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def test_circuit_opens_probes_and_closes(self):
+		circuit = HostCircuitBreaker(base_delay=5, max_delay=60)
+		host = "news.google.com"
+
+		circuit.record_response(f"https://{host}/rss", 429)
+		self.assertFalse(circuit.allow(host))
+		self.assertEqual((circuit.opened, circuit.rejected), (1, 1))
+		self.assertIn(host, circuit.dirty)
+		self.assertEqual(circuit.retry_in(host), 5)
+
+		self.now += 5
+		# Half open: exactly one probe goes through until its result is recorded
+		self.assertTrue(circuit.allow(host))
+		self.assertFalse(circuit.allow(host))
+
+		circuit.record_response(f"https://{host}/rss", 200)
+		self.assertTrue(circuit.allow(host))
+		self.assertEqual(circuit.hosts[host]["failures"], 0)
+
+	def test_failed_probe_backs_off_longer(self):
+		circuit = HostCircuitBreaker(base_delay=5, max_delay=60)
+		circuit.record_failure("example.com")
+		self.now += 5
+		self.assertTrue(circuit.allow("example.com"))
+
+		self.assertEqual(circuit.record_failure("example.com"), 10)
+		self.assertEqual(circuit.record_failure("example.com", retry_after=30), 30)
+		self.assertFalse(circuit.allow("example.com"))
+		self.assertEqual(circuit.hosts["example.com"]["failures"], 3)
+
+	def test_captcha_detection_is_limited_to_google(self):
+		self.assertTrue(is_captcha_page("https://www.google.com/sorry/index?continue=x"))
+		self.assertTrue(is_captcha_page("https://consent.google.com/ml?continue=x"))
+		self.assertFalse(
+			is_captcha_page("https://gulfnews.com/story", '<div class="g-recaptcha captcha-form"></div>')
+		)
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from frappe.tests import UnitTestCase
+
+from crm import news_fetcher
+from crm.news_fetcher import ArticleContentFetcher, HostState, TokenBucket
+
+
+class FakeClock:
+	"""Stand-in for time.monotonic and asyncio.sleep; sleeping only advances the clock"""
+
+	def __init__(self):
+		self.now = 0.0
+		self.sleeps = []
+
+	def monotonic(self):
+		return self.now
+
+	async def sleep(self, delay):
+		self.sleeps.append(delay)
+		self.now += delay
+
+
+class UnitTestNewsFetcher(UnitTestCase):
+	def setUp(self):
+		self.clock = FakeClock()
+		for patcher in (
+			patch.object(news_fetcher, "time", self.clock),
+			patch.object(asyncio, "sleep", self.clock.sleep),
+			# No jitter
+			patch.object(news_fetcher, "random", SimpleNamespace(uniform=lambda low, high: low)),
+		):
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def acquire(self, bucket, times):
+		async def run():
+			for _ in range(times):
+				await bucket.acquire()
+
+		asyncio.run(run())
+
+	def test_token_bucket_allows_burst_then_waits(self):
+		bucket = TokenBucket(rate=4, capacity=2)
+
+		self.acquire(bucket, 2)
+		self.assertEqual(self.clock.sleeps, [])
+
+		# The emptied bucket carries over to the next event loop
+		self.acquire(bucket, 2)
+		self.assertEqual(self.clock.sleeps, [0.25, 0.25])
+
+	def test_token_bucket_refills_with_time(self):
+		bucket = TokenBucket(rate=4, capacity=2)
+		self.acquire(bucket, 2)
+
+		self.clock.now += 1
+		self.acquire(bucket, 2)
+		self.assertEqual(self.clock.sleeps, [])
+
+	def test_host_state_throttle_delays_host(self):
+		state = HostState(rate=100, capacity=1)
+		delay = state.throttle(retry_after=0.5, base_delay=0.25, max_delay=1)
+		self.assertEqual(delay, 0.5)
+
+		asyncio.run(state.wait())
+		self.assertEqual(self.clock.sleeps, [0.5])
+
+	def test_host_state_backs_off_exponentially_until_recovered(self):
+		state = HostState(rate=100, capacity=1)
+		delays = [state.throttle(None, base_delay=1, max_delay=5) for _ in range(4)]
+		state.recover()
+		after_recovery = state.throttle(None, base_delay=1, max_delay=5)
+
+		self.assertEqual(delays, [2, 4, 5, 5])
+		self.assertEqual(after_recovery, 2)
+
+	def test_fetcher_limits_per_host(self):
+		fetcher = ArticleContentFetcher()
+		self.assertIs(
+			fetcher._host_state("https://example.com/a"), fetcher._host_state("https://example.com/b")
+		)
+		self.assertIsNot(
+			fetcher._host_state("https://example.com/a"), fetcher._host_state("https://example.org/a")
+		)
@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests import UnitTestCase
+
+from crm import news_scraper
+from crm.crm.doctype.news.news import get_link_hash
+from crm.news_scraper import decode_article_token
+
+
+class UnitTestDecodeArticleToken(UnitTestCase):
+	def test_decode_article_token_stops_at_url_length(self):
+		# Token from the benchmark RSS fixture; the URL is followed by a protobuf trailer
+		token = (
+			"CBMiZWh0dHBzOi8vd3d3Lmd1bGZuZXdzLmNvbS9idXNpbmVzcy9wcm9wZXJ0eS9kdWJhaS1wcm9wZXJ0eS1w"
+			"cmljZXMtY2xpbWItZm9yLTE0dGgtc3RyYWlnaHQtcXVhcnRlci0xMDAw0gEA"
+		)
+		self.assertEqual(
+			decode_article_token(token),
+			"https://www.gulfnews.com/business/property/dubai-property-prices-climb-for-14th-straight-quarter-1000",
+		)
+
+	def test_decode_article_token_without_url(self):
+		self.assertIsNone(decode_article_token("AU_yqLOabc"))
+
+
+class UnitTestNewsScrapeDispatcher(UnitTestCase):
+	def setUp(self):
+		self.pending = []
+		self.active = set()
+		self.configs = ["Dubai Property", "Abu Dhabi Property", "Sharjah Property", "Emaar"]
+
+		cache = MagicMock()
+		cache.rpush.side_effect = lambda key, value: self.pending.append(value)
+		cache.lpop.side_effect = lambda key: self.pending.pop(0) if self.pending else None
+		cache.llen.side_effect = lambda key: len(self.pending)
+		cache.delete_value.side_effect = lambda key: self.pending.clear()
+
+		def enqueue(method, job_id, **kwargs):
+			self.active.add(job_id)
+
+		for patcher in (
+			patch.object(frappe, "cache", cache),
+			patch.object(frappe, "enqueue", enqueue),
+			patch.object(frappe, "get_all", lambda *args, **kwargs: list(self.configs)),
+			patch.object(news_scraper, "is_job_enqueued", lambda job_id: job_id in self.active),
+			patch.object(
+				news_scraper,
+				"_get_scraper_settings",
+				lambda: frappe._dict(max_parallel_jobs=2, job_timeout=60),
+			),
+		):
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def finish(self, config_name):
+		self.active.discard(news_scraper._get_job_id(config_name))
+
+	def test_dispatch_starts_max_parallel_jobs(self):
+		news_scraper.scrape_and_store_news()
+
+		self.assertEqual(self.active, {"news_scrape::Dubai Property", "news_scrape::Abu Dhabi Property"})
+		self.assertEqual(self.pending, ["Sharjah Property", "Emaar"])
+
+		# A finished job hands its slot to the next pending config
+		self.finish("Dubai Property")
+		news_scraper._enqueue_next_config()
+		self.assertEqual(self.active, {"news_scrape::Abu Dhabi Property", "news_scrape::Sharjah Property"})
+
+	def test_top_up_restarts_a_broken_chain(self):
+		news_scraper.scrape_and_store_news()
+
+		# Both jobs die without starting the next config
+		self.finish("Dubai Property")
+		self.finish("Abu Dhabi Property")
+		news_scraper.top_up_news_scrape_jobs()
+		self.assertEqual(self.active, {"news_scrape::Sharjah Property", "news_scrape::Emaar"})
+		self.assertEqual(self.pending, [])
+
+	def test_top_up_keeps_the_parallel_limit(self):
+		news_scraper.scrape_and_store_news()
+
+		self.finish("Dubai Property")
+		news_scraper.top_up_news_scrape_jobs()
+		news_scraper.top_up_news_scrape_jobs()
+		self.assertEqual(len(self.active), 2)
+		self.assertEqual(self.pending, ["Emaar"])
+
+
+class UnitTestIncrementalScrape(UnitTestCase):
+	def setUp(self):
+		self.now = datetime(2025, 4, 10, 12, 0, 0)
+		patcher = patch.object(frappe.utils, "now_datetime", lambda: self.now)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def timeframe_after(self, elapsed, timeframe="7d"):
+		return news_scraper.get_incremental_timeframe(self.now - elapsed, timeframe)
+
+	def test_timeframe_is_unchanged_without_a_previous_run(self):
+		self.assertEqual(news_scraper.get_incremental_timeframe(None, "7d"), "7d")
+		self.assertEqual(self.timeframe_after(timedelta(hours=1), "1y"), "1y")
+
+	def test_timeframe_rounds_up_to_hours_with_overlap(self):
+		self.assertEqual(self.timeframe_after(timedelta(minutes=30)), "2h")
+		self.assertEqual(self.timeframe_after(timedelta(hours=5, minutes=10)), "7h")
+		self.assertEqual(self.timeframe_after(timedelta(hours=46)), "48h")
+
+	def test_timeframe_switches_to_days_after_two_days(self):
+		self.assertEqual(self.timeframe_after(timedelta(hours=47)), "3d")
+		self.assertEqual(self.timeframe_after(timedelta(hours=60)), "3d")
+
+	def test_timeframe_is_clamped_to_the_configured_window(self):
+		self.assertEqual(self.timeframe_after(timedelta(days=10)), "7d")
+		self.assertEqual(self.timeframe_after(timedelta(hours=11), "12h"), "12h")
+		self.assertEqual(self.timeframe_after(timedelta(days=40), "1m"), "1m")
+
+	def drop_seen(self, articles, since=None, seen_link=None, grace=3600):
+		scraper = news_scraper.GoogleNewsScraper.__new__(news_scraper.GoogleNewsScraper)
+		scraper.config = {
+			"since": since,
+			"sinceGrace": grace,
+			"seenLinkHash": get_link_hash(seen_link) if seen_link else None,
+		}
+		return [article["link"] for article in scraper._drop_seen_articles(articles)]
+
+	def articles(self, *dates):
+		return [
+			{"link": f"https://example.com/{index}", "datetime": date}
+			for index, date in enumerate(dates)
+		]
+
+	def test_drop_seen_keeps_everything_without_a_mark(self):
+		articles = self.articles("2025-04-10T11:00:00Z", "2025-04-01T11:00:00Z")
+		self.assertEqual(self.drop_seen(articles), ["https://example.com/0", "https://example.com/1"])
+
+	def test_drop_seen_keeps_articles_within_the_grace_period(self):
+		articles = self.articles("2025-04-10T09:30:00Z", None, "2025-04-10T08:59:59Z")
+		self.assertEqual(
+			self.drop_seen(articles, since="2025-04-10T10:00:00Z"),
+			["https://example.com/0", "https://example.com/1"],
+		)
+		self.assertEqual(
+			self.drop_seen(articles, since="2025-04-10T10:00:00Z", grace=0),
+			["https://example.com/1"],
+		)
+
+	def test_drop_seen_stops_at_the_seen_link_in_date_order(self):
+		articles = self.articles(
+			"2025-04-10T11:00:00Z", "2025-04-10T10:00:00Z", "2025-04-10T09:00:00Z", "2025-04-10T08:00:00Z"
+		)
+		self.assertEqual(
+			self.drop_seen(articles, seen_link="https://example.com/2"),
+			["https://example.com/0", "https://example.com/1"],
+		)
+
+	def test_drop_seen_skips_only_the_seen_link_out_of_order(self):
+		articles = self.articles(
+			"2025-04-10T09:00:00Z", "2025-04-10T11:00:00Z", "2025-04-10T10:00:00Z", "2025-04-10T08:00:00Z"
+		)
+		self.assertEqual(
+			self.drop_seen(articles, seen_link="https://example.com/2"),
+			["https://example.com/0", "https://example.com/1", "https://example.com/3"],
+		)